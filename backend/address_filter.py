@@ -0,0 +1,100 @@
+import hashlib
+import math
+import threading
+
+# Bloom filter over known wallet addresses: a miss means "definitely not a
+# wallet", a hit still goes to the database. Addresses are lowercased so the
+# filter never rejects an address the database would match.
+
+
+class BloomFilter:
+    def __init__(self, capacity, fp_rate=0.01):
+        self.capacity = max(int(capacity), 1)
+        self.fp_rate = fp_rate
+        self.size = max(
+            8, math.ceil(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2))
+        )
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, key):
+        # Double hashing: k bit positions from one 128-bit digest
+        digest = hashlib.blake2b(key.lower().encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        positions = self._positions(key)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def to_bytes(self):
+        return bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data, capacity, fp_rate, count=0):
+        # Rebuild a filter saved with to_bytes() (same capacity and fp_rate)
+        bloom = cls(capacity, fp_rate)
+        if len(data) != len(bloom._bits):
+            raise ValueError("Bloom filter data does not match its parameters")
+        bloom._bits = bytearray(data)
+        bloom.count = count
+        return bloom
+
+    @property
+    def memory_bytes(self):
+        return len(self._bits)
+
+    def estimated_fp_rate(self):
+        # (1 - e^(-kn/m))^k for the number of keys added so far
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+
+class AddressFilter:
+    # Bloom filter plus counters for rejected lookups and for "maybe" answers
+    # that turned out to be misses (observed false positives)
+
+    def __init__(self, capacity, fp_rate=0.01):
+        self.bloom = BloomFilter(capacity, fp_rate)
+        self.rejected = 0
+        self.false_positives = 0
+        self.event_positions = None
+
+    def add(self, *addresses):
+        for address in addresses:
+            if address:
+                self.bloom.add(address)
+
+    def might_exist(self, address):
+        if address in self.bloom:
+            return True
+        self.rejected += 1
+        return False
+
+    def record_false_positive(self):
+        self.false_positives += 1
+
+    def stats(self):
+        return {
+            "addresses": self.bloom.count,
+            "capacity": self.bloom.capacity,
+            "hash_functions": self.bloom.hash_count,
+            "memory_bytes": self.bloom.memory_bytes,
+            "estimated_fp_rate": round(self.bloom.estimated_fp_rate(), 6),
+            # Every rejection is a true negative, so negatives = rejected + false positives
+            "observed_fp_rate": round(
+                self.false_positives / (self.false_positives + self.rejected), 6
+            )
+            if self.false_positives
+            else 0.0,
+            "rejected_lookups": self.rejected,
+        }
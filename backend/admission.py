@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import Counter
+
+from flask import jsonify, request
+
+# Admission control in front of the Flask views. Each limited endpoint gets a
+# concurrency gate with a bounded wait queue (503 when the queue is full or
+# the wait times out) and optionally per-address token buckets (429 when a
+# caller runs out of tokens). Rejections happen before any database or
+# network work, so overload is shed quickly instead of piling up threads.
+# Nothing is registered on the app when no limits are configured.
+
+
+def parse_limits(spec):
+    # "get_balance=32,*=64" -> {"get_balance": 32, "*": 64}
+    limits = {}
+    for part in spec.split(","):
+        if part.strip():
+            name, _, value = part.partition("=")
+            limits[name.strip()] = int(value)
+    return limits
+
+
+def parse_rates(spec):
+    # "initiate_transfer=1/5" -> {"initiate_transfer": (1.0, 5.0)}: tokens per second / burst
+    rates = {}
+    for part in spec.split(","):
+        if part.strip():
+            name, _, value = part.partition("=")
+            rate, _, burst = value.partition("/")
+            rates[name.strip()] = (float(rate), float(burst or rate))
+    return rates
+
+
+class ConcurrencyGate:
+    # At most `limit` requests inside, at most `queue_size` waiting for a slot
+
+    def __init__(self, limit, queue_size):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout):
+        # "admitted", "queue_full" or "timeout"
+        with self._condition:
+            if self.active < self.limit:
+                self.active += 1
+                return "admitted"
+            if self.waiting >= self.queue_size:
+                return "queue_full"
+
+            self.waiting += 1
+            deadline = time.monotonic() + timeout
+            try:
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return "timeout"
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            return "admitted"
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+class TokenBuckets:
+    # One token bucket per key, refilled at `rate` tokens/second up to `burst`
+
+    def __init__(self, rate, burst, max_keys=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        # 0 if a token was taken, else seconds until one is available
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / self.rate if self.rate > 0 else 60
+
+            # Full buckets carry no state worth keeping
+            if len(self._buckets) > self.max_keys:
+                idle = self.burst / self.rate if self.rate > 0 else float("inf")
+                for stale in [
+                    k for k, (_, t) in self._buckets.items() if now - t >= idle
+                ]:
+                    del self._buckets[stale]
+        return wait
+
+
+class AdmissionController:
+    def __init__(
+        self, app, limits=None, rates=None, queue_size=16, queue_timeout=0.5, exempt=()
+    ):
+        self.queue_timeout = queue_timeout
+        self.exempt = set(exempt)
+        self.queue_size = queue_size
+        limits = dict(limits or {})
+        self.default_limit = limits.pop("*", None)
+        self.gates = {
+            endpoint: ConcurrencyGate(limit, queue_size) for endpoint, limit in limits.items()
+        }
+        self.buckets = {
+            endpoint: TokenBuckets(rate, burst)
+            for endpoint, (rate, burst) in (rates or {}).items()
+        }
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def _gate_for(self, endpoint):
+        gate = self.gates.get(endpoint)
+        if gate is None and self.default_limit and endpoint not in self.exempt:
+            with self._lock:
+                gate = self.gates.setdefault(
+                    endpoint, ConcurrencyGate(self.default_limit, self.queue_size)
+                )
+        return gate
+
+    def _count(self, endpoint, outcome):
+        with self._lock:
+            self.counters[(endpoint, outcome)] += 1
+
+    def _request_address(self):
+        # The address a request acts for: URL <address> or JSON from_address
+        address = (request.view_args or {}).get("address")
+        if not address and request.is_json:
+            address = (request.get_json(silent=True) or {}).get("from_address")
+        return address.lower() if isinstance(address, str) else None
+
+    def _before_request(self):
+        endpoint = request.endpoint
+        if endpoint is None:
+            return None
+
+        buckets = self.buckets.get(endpoint)
+        if buckets is not None:
+            address = self._request_address()
+            if address:
+                wait = buckets.take(address)
+                if wait:
+                    self._count(endpoint, "rate_limited")
+                    response = jsonify(
+                        {"success": False, "error": "Too many requests for this address"}
+                    )
+                    response.status_code = 429
+                    response.headers["Retry-After"] = str(max(1, round(wait)))
+                    return response
+
+        gate = self._gate_for(endpoint)
+        if gate is None:
+            return None
+        outcome = gate.acquire(self.queue_timeout)
+        self._count(endpoint, outcome)
+        if outcome != "admitted":
+            response = jsonify({"success": False, "error": "Server busy, try again shortly"})
+            response.status_code = 503
+            response.headers["Retry-After"] = "1"
+            return response
+
+        # environ, not g: /api/batch sub-requests share the outer app context
+        request.environ["wallet.admission_gate"] = gate
+        return None
+
+    def _teardown_request(self, exc):
+        gate = request.environ.pop("wallet.admission_gate", None)
+        if gate is not None:
+            gate.release()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            gates = dict(self.gates)
+        endpoints = {}
+        for (endpoint, outcome), count in counters.items():
+            endpoints.setdefault(endpoint, {})[outcome] = count
+        for endpoint, gate in gates.items():
+            entry = endpoints.setdefault(endpoint, {})
+            entry["active"] = gate.active
+            entry["waiting"] = gate.waiting
+            entry["limit"] = gate.limit
+        return endpoints
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import AIRDROP_CHUNK_SIZE, CONSUMER_NAME, read_airdrop_csv, run_airdrop
+
+
+def report_progress(index, totals):
+    # Called after each committed chunk
+    print(
+        f"   shard {index}: {totals['credited']} addresses credited, "
+        f"{totals['wallets_created']} new wallets"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Credit many addresses at once from an address,amount CSV file"
+    )
+    parser.add_argument("airdrop_id", help="name of this airdrop (reuse it to resume)")
+    parser.add_argument("file", nargs="?", help="address,amount CSV file (default: stdin)")
+    parser.add_argument("--chunk-size", type=int, default=AIRDROP_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    print("CypherD Wallet Airdrop")
+    print("=" * 50)
+
+    if not CONSUMER_NAME.match(args.airdrop_id):
+        print("airdrop_id must be 1-64 letters, digits, '.', '-' or '_'")
+        sys.exit(1)
+
+    try:
+        if args.file:
+            with open(args.file, encoding="utf-8", newline="") as source:
+                credits = read_airdrop_csv(source)
+        else:
+            credits = read_airdrop_csv(sys.stdin)
+    except ValueError as e:
+        print(f"Invalid airdrop file: {e}")
+        sys.exit(1)
+    print(f"   {len(credits)} credits read")
+
+    started = time.perf_counter()
+    try:
+        summary = run_airdrop(args.airdrop_id, credits, args.chunk_size, report_progress)
+    except ValueError as e:
+        print(f"Error: {e}")
+        print("Use a new airdrop_id, or the original file and --chunk-size to resume")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error applying airdrop: {e}")
+        print("Committed chunks are kept; run again with the same arguments to resume")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+
+    print()
+    print("Airdrop complete")
+    print(f"   Addresses credited: {summary['credited']}")
+    print(f"   New wallets: {summary['wallets_created']}")
+    print(f"   Total amount: {summary['amount']} ETH")
+    print(f"   Chunks applied: {summary['chunks']} ({summary['skipped_chunks']} already applied)")
+    print(f"   Elapsed: {elapsed:.1f}s ({summary['credited'] / max(elapsed, 1e-9):.0f} addresses/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,110 @@
+import atexit
+import csv
+import hashlib
+import json
+import math
 import os
+import re
 import time
 import random
+import secrets
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from sqlalchemy import create_engine, Column, String, Float, DateTime, Integer, Text
+from sqlalchemy import (
+    create_engine,
+    func,
+    bindparam,
+    cast,
+    delete,
+    event,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+    Column,
+    MetaData,
+    String,
+    Table,
+    Float,
+    Date,
+    DateTime,
+    Integer,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from eth_account import Account
+from eth_utils import to_checksum_address
 from mnemonic import Mnemonic
 from dotenv import load_dotenv
 import requests
 
+from notifications import NotificationDigest, format_timestamp, render_transfer
+from signing import RecentSignatureFilter, recover_message_address, signature_fingerprint
+from wallet_pool import KeypairPool, generate_keypair
+from hd_wallet import MAX_CHILD_INDEX, derive_addresses
+from group_commit import GroupCommitWriter
+from sharding import ReadYourWritesTracker, ShardRouter
+from profiling import RequestProfiler
+from admission import AdmissionController, parse_limits, parse_rates
+from event_feed import FeedNotifier, format_cursor, parse_cursor, poll
+from address_filter import AddressFilter
+from intents import ADDRESS_PATTERN, cancel_schedule_message, parse_intent, parse_schedule
+import archive
+
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
 
+# Request profiling (disabled unless a sample rate, slow threshold or admin token is set)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 0))
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+
+request_profiler = None
+if PROFILE_SAMPLE_RATE > 0 or PROFILE_SLOW_MS > 0 or PROFILE_ADMIN_TOKEN:
+    request_profiler = RequestProfiler(
+        app,
+        PROFILE_DIR,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        slow_ms=PROFILE_SLOW_MS,
+        admin_token=PROFILE_ADMIN_TOKEN,
+    )
+
+# Admission control: per-endpoint concurrency limits with a bounded wait queue
+# (503 when full) and per-address token buckets (429), e.g.
+# ADMISSION_LIMITS=get_balance=32,initiate_transfer=8,*=64
+# ADDRESS_RATE_LIMITS=initiate_transfer=1/5,get_balance=10/20 (tokens per second/burst)
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "")
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", 16))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", 500))
+ADDRESS_RATE_LIMITS = os.getenv("ADDRESS_RATE_LIMITS", "")
+
+admission = None
+if ADMISSION_LIMITS or ADDRESS_RATE_LIMITS:
+    admission = AdmissionController(
+        app,
+        limits=parse_limits(ADMISSION_LIMITS),
+        rates=parse_rates(ADDRESS_RATE_LIMITS),
+        queue_size=ADMISSION_QUEUE_SIZE,
+        queue_timeout=ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+        exempt=("health_check",),
+    )
+
 # Database setup
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///wallet.db")
 engine = create_engine(DATABASE_URL)
@@ -41,6 +124,8 @@ class Wallet(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Ids of archived (deleted) rows must never be handed out again
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     from_address = Column(String, index=True)
@@ -65,231 +150,475 @@ class PendingTransfer(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class PendingTransferOutput(Base):
+    __tablename__ = "pending_transfer_outputs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pending_transfer_id = Column(Integer, index=True)
+    to_address = Column(String)
+    amount = Column(Float)
+
+
+class AddressDailyVolume(Base):
+    __tablename__ = "address_daily_volume"
+    __table_args__ = (UniqueConstraint("address", "day"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    address = Column(String, index=True)
+    day = Column(Date)
+    sent_count = Column(Integer, default=0)
+    sent_amount = Column(Float, default=0.0)
+    received_count = Column(Integer, default=0)
+    received_amount = Column(Float, default=0.0)
+
+
+class UsedSignature(Base):
+    __tablename__ = "used_signatures"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String(64), unique=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ScheduledTransfer(Base):
+    __tablename__ = "scheduled_transfers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    from_address = Column(String, index=True)
+    to_address = Column(String)
+    amount = Column(Float)
+    interval_seconds = Column(Integer, default=0)
+    remaining = Column(Integer, nullable=True)  # None = unlimited
+    runs = Column(Integer, default=0)
+    next_run_at = Column(DateTime, index=True)
+    status = Column(String, default="active", index=True)
+    signature = Column(Text)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class LedgerEvent(Base):
+    __tablename__ = "ledger_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String)
+    address = Column(String, index=True)
+    payload = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ConsumerOffset(Base):
+    __tablename__ = "consumer_offsets"
+    __table_args__ = (UniqueConstraint("consumer", "shard"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    consumer = Column(String, index=True)
+    shard = Column(Integer)
+    position = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Optional address-hash sharding: comma-separated database URLs, one per shard
+SHARD_URLS = [url.strip() for url in os.getenv("SHARD_URLS", "").split(",") if url.strip()]
+
+# Read-only routes use separate engines: READ_REPLICA_URLS lists replicas per
+# shard (";" between shards, "," between replicas of one shard). Without
+# replicas each shard gets its own read engine on the primary URL.
+READ_REPLICA_URLS = os.getenv("READ_REPLICA_URLS", "")
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+primary_urls = SHARD_URLS or [DATABASE_URL]
+replica_groups = [
+    [url.strip() for url in group.split(",") if url.strip()]
+    for group in READ_REPLICA_URLS.split(";")
+    if group.strip()
+]
+if replica_groups and len(replica_groups) != len(primary_urls):
+    raise ValueError("READ_REPLICA_URLS must list one replica group per shard")
+read_engines = [
+    [create_engine(url) for url in (replica_groups[i] if replica_groups else [primary_url])]
+    for i, primary_url in enumerate(primary_urls)
+]
+
+if SHARD_URLS:
+    shards = ShardRouter([create_engine(url) for url in SHARD_URLS], read_engines)
+else:
+    shards = ShardRouter([engine], read_engines)
+
+recent_writes = ReadYourWritesTracker(READ_YOUR_WRITES_SECONDS)
+
+
+def read_session_for(address):
+    # Session for a read-only query about an address. Addresses written within
+    # READ_YOUR_WRITES_SECONDS (or requests with X-Read-Consistency: primary)
+    # read from the primary so they see their own writes.
+    if (
+        request.headers.get("X-Read-Consistency") == "primary"
+        or recent_writes.is_pinned(address)
+    ):
+        return shards.session_for(address)
+    return shards.read_session_at(shards.index_for(address))
+
+
+def read_engine_for(address):
+    # Engine for an ORM-free read about an address (same routing as read_session_for)
+    index = shards.index_for(address)
+    if (
+        request.headers.get("X-Read-Consistency") == "primary"
+        or recent_writes.is_pinned(address)
+    ):
+        return shards.engines[index]
+    return shards.read_engine_at(index)
+
+
+# Cold storage for archived transactions (see archive_transactions.py)
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+
 # Create tables
 Base.metadata.create_all(bind=engine)
+for shard_engine in shards.engines:
+    if shard_engine is not engine:
+        Base.metadata.create_all(bind=shard_engine)
+
+
+# Hot read paths use Core statements built once; SQLAlchemy caches their
+# compiled form, and rows come back as plain tuples instead of ORM objects
+BALANCE_QUERY = select(Wallet.balance).where(Wallet.address == bindparam("address"))
+HISTORY_COLUMNS = (
+    Transaction.id,
+    Transaction.from_address,
+    Transaction.to_address,
+    Transaction.amount,
+    Transaction.amount_usd,
+    Transaction.status,
+    Transaction.created_at,
+)
+HISTORY_QUERY = (
+    select(*HISTORY_COLUMNS)
+    .where(
+        or_(
+            Transaction.from_address == bindparam("address"),
+            Transaction.to_address == bindparam("address"),
+        )
+    )
+    .order_by(Transaction.created_at.desc())
+    .limit(bindparam("limit"))
+)
+HISTORY_SINCE_QUERY = HISTORY_QUERY.where(Transaction.created_at >= bindparam("since"))
+HISTORY_DELTA_QUERY = (
+    select(*HISTORY_COLUMNS)
+    .where(
+        or_(
+            Transaction.from_address == bindparam("address"),
+            Transaction.to_address == bindparam("address"),
+        ),
+        Transaction.id > bindparam("since_id"),
+    )
+    .order_by(Transaction.id)
+    .limit(bindparam("limit"))
+)
+EVENTS_QUERY = (
+    select(
+        LedgerEvent.id,
+        LedgerEvent.event_type,
+        LedgerEvent.address,
+        LedgerEvent.payload,
+        LedgerEvent.created_at,
+    )
+    .where(LedgerEvent.id > bindparam("after"))
+    .order_by(LedgerEvent.id)
+    .limit(bindparam("limit"))
+)
+
+# Id cursors (delta sync, event feed) assume rows become visible in id order.
+# SQLite has one writer at a time, so they do. PostgreSQL hands out ids at
+# insert time, so a lower id could commit after a higher one and be skipped.
+# There every write transaction first takes this transaction-scoped advisory
+# lock, making writes on a shard commit one at a time (and so in id order,
+# with nothing to hold back on the read side). Taking it before any row lock
+# keeps it deadlock-free.
+COMMIT_ORDER_LOCK = 7361626
+
+
+def is_write(statement):
+    # INSERT/UPDATE/DELETE or SELECT ... FOR UPDATE
+    return getattr(statement, "is_dml", False) or (
+        getattr(statement, "_for_update_arg", None) is not None
+    )
+
+
+def order_commits(write_engine):
+    # Serialize write transactions on a PostgreSQL engine (see COMMIT_ORDER_LOCK)
+    if write_engine.dialect.name != "postgresql":
+        return
+
+    @event.listens_for(write_engine, "before_execute")
+    def take_commit_order_lock(conn, statement, multiparams, params, execution_options):
+        if is_write(statement) and not conn.info.get("commit_order_locked"):
+            conn.info["commit_order_locked"] = True
+            conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({COMMIT_ORDER_LOCK})")
+
+    @event.listens_for(write_engine, "commit")
+    @event.listens_for(write_engine, "rollback")
+    def release_commit_order_lock(conn):
+        conn.info.pop("commit_order_locked", None)
+
+
+for write_engine in {engine, *shards.engines}:
+    order_commits(write_engine)
+
+
+def open_transaction(db):
+    # pysqlite only sends BEGIN before the first write, and a SAVEPOINT released
+    # outside a transaction commits on the spot. Begin explicitly so savepoints
+    # (db.begin_nested()) stay inside the caller's commit.
+    dbapi_connection = db.connection().connection.dbapi_connection
+    if db.get_bind().dialect.name == "sqlite" and not dbapi_connection.in_transaction:
+        dbapi_connection.execute("BEGIN")
+
+
+def upsert_insert(db, table):
+    # Dialect-specific INSERT supporting ON CONFLICT for the session's database
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql_insert(table)
+    return sqlite_insert(table)
+
+
+def record_event(db, event_type, address, **data):
+    # Append a ledger event inside the caller's transaction (see /api/events)
+    if event_type == "wallet.created" and address_filter is not None:
+        address_filter.add(address)
+    db.add(
+        LedgerEvent(
+            event_type=event_type,
+            address=address,
+            payload=json.dumps(data, separators=(",", ":")),
+        )
+    )
+
+
+def claim_signature(db, signature):
+    # Record a transfer signature's fingerprint inside the caller's transaction;
+    # the unique index makes this the atomic replay check. False if already used.
+    return claim_fingerprint(db, signature_fingerprint(signature))
+
+
+def claim_fingerprint(db, fingerprint):
+    table = UsedSignature.__table__
+    result = db.execute(
+        upsert_insert(db, table)
+        .values(fingerprint=fingerprint, created_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=[table.c.fingerprint])
+    )
+    return result.rowcount == 1
+
+
+def record_daily_volume(db, from_address, to_address, amount, day):
+    # Add one transfer to the per-address daily rollup (same transaction as the transfer)
+    record_address_volume(db, from_address, "sent", amount, day)
+    record_address_volume(db, to_address, "received", amount, day)
+
+
+def record_address_volume(db, address, direction, amount, day):
+    # Add one side ("sent" or "received") of a transfer to an address's daily rollup
+    table = AddressDailyVolume.__table__
+    count_column = table.c[f"{direction}_count"]
+    amount_column = table.c[f"{direction}_amount"]
+    values = {
+        "address": address,
+        "day": day,
+        "sent_count": 0,
+        "sent_amount": 0.0,
+        "received_count": 0,
+        "received_amount": 0.0,
+    }
+    values[count_column.name] = 1
+    values[amount_column.name] = amount
+    stmt = (
+        upsert_insert(db, table)
+        .values(**values)
+        .on_conflict_do_update(
+            index_elements=[table.c.address, table.c.day],
+            set_={
+                count_column.name: count_column + 1,
+                amount_column.name: amount_column + amount,
+            },
+        )
+    )
+    db.execute(stmt)
+
+
+def rebuild_daily_volume(db, shard_index=0):
+    # Recompute the rollup for the addresses owned by one shard from its
+    # transactions. Days before the archive boundary keep their rollups; the
+    # boundary day itself is rebuilt from hot and archived rows together.
+    boundary = archive.archived_before(ARCHIVE_DIR, shard_index)
+    first_day = boundary.date() if boundary else None
+
+    stale = db.query(AddressDailyVolume)
+    hot = db.query(
+        Transaction.id,
+        Transaction.from_address,
+        Transaction.to_address,
+        Transaction.amount,
+        Transaction.created_at,
+    ).filter(Transaction.status.in_(["completed", "prepared"]))
+    if first_day:
+        stale = stale.filter(AddressDailyVolume.day >= first_day)
+        hot = hot.filter(
+            Transaction.created_at >= datetime.combine(first_day, datetime.min.time())
+        )
+    stale.delete(synchronize_session=False)
+
+    totals = {}
+
+    def add(from_address, to_address, amount, created_at):
+        day = created_at.date()
+        # The airdrop pseudo-sender has no wallet, and no rollup on the live path
+        if from_address != AIRDROP_SENDER and shards.index_for(from_address) == shard_index:
+            sent = totals.setdefault((from_address, day), [0, 0.0, 0, 0.0])
+            sent[0] += 1
+            sent[1] += amount
+        if shards.index_for(to_address) == shard_index:
+            received = totals.setdefault((to_address, day), [0, 0.0, 0, 0.0])
+            received[2] += 1
+            received[3] += amount
+
+    hot_ids = set()
+    for tx_id, from_address, to_address, amount, created_at in hot.yield_per(1000):
+        if first_day:
+            hot_ids.add(tx_id)
+        add(from_address, to_address, amount, created_at)
+    if first_day:
+        for record in archive.iter_archived_transactions(
+            ARCHIVE_DIR, shard_index, since=datetime.combine(first_day, datetime.min.time())
+        ):
+            if record["id"] not in hot_ids:
+                add(
+                    record["from_address"],
+                    record["to_address"],
+                    record["amount"],
+                    record["created_at"],
+                )
+
+    rows = [
+        {
+            "address": address,
+            "day": day,
+            "sent_count": values[0],
+            "sent_amount": values[1],
+            "received_count": values[2],
+            "received_amount": values[3],
+        }
+        for (address, day), values in totals.items()
+    ]
+    if rows:
+        db.execute(insert(AddressDailyVolume), rows)
+    return len(rows)
+
+
+# Negative-lookup cache: a Bloom filter of wallet addresses lets balance and
+# history reads for unknown addresses skip the database. Wallets created by
+# this process are added directly; wallets created elsewhere (bulk_import.py,
+# other workers) are picked up from wallet.created events.
+ADDRESS_FILTER = os.getenv("ADDRESS_FILTER", "false").lower() in ("1", "true", "yes")
+ADDRESS_FILTER_CAPACITY = int(os.getenv("ADDRESS_FILTER_CAPACITY", 1000000))
+ADDRESS_FILTER_FP_RATE = float(os.getenv("ADDRESS_FILTER_FP_RATE", 0.01))
+ADDRESS_FILTER_REFRESH_SECONDS = float(os.getenv("ADDRESS_FILTER_REFRESH_SECONDS", 10))
+
+WALLET_EVENTS_QUERY = EVENTS_QUERY.where(LedgerEvent.event_type == "wallet.created")
+
+
+def build_address_filter():
+    # Load every wallet address. Event positions are taken first, so wallets
+    # created during the scan are also seen by the next refresh.
+    positions = []
+    wallet_count = 0
+    for shard_engine in shards.engines:
+        with shard_engine.connect() as conn:
+            positions.append(conn.execute(select(func.max(LedgerEvent.id))).scalar() or 0)
+            wallet_count += conn.execute(select(func.count(Wallet.id))).scalar()
+
+    address_filter = AddressFilter(
+        max(ADDRESS_FILTER_CAPACITY, wallet_count * 2), ADDRESS_FILTER_FP_RATE
+    )
+    for shard_engine in shards.engines:
+        with shard_engine.connect() as conn:
+            for partition in (
+                conn.execution_options(yield_per=10000)
+                .execute(select(Wallet.address))
+                .partitions()
+            ):
+                address_filter.add(*(address for (address,) in partition))
+    address_filter.event_positions = positions
+    return address_filter
+
+
+def refresh_address_filter():
+    # Add wallets announced in the ledger event log since the last refresh
+    for index, shard_engine in enumerate(shards.engines):
+        while True:
+            with shard_engine.connect() as conn:
+                rows = conn.execute(
+                    WALLET_EVENTS_QUERY,
+                    {"after": address_filter.event_positions[index], "limit": 10000},
+                ).all()
+            if not rows:
+                break
+            address_filter.add(*(row[2] for row in rows))
+            address_filter.event_positions[index] = rows[-1][0]
+
+
+def refresh_address_filter_forever():
+    while True:
+        time.sleep(ADDRESS_FILTER_REFRESH_SECONDS)
+        try:
+            refresh_address_filter()
+        except Exception as e:
+            print(f"Address filter refresh failed: {e}")
+
+
+address_filter = None
+if ADDRESS_FILTER:
+    address_filter = build_address_filter()
+    print(
+        f"Address filter: {address_filter.bloom.count} wallets, "
+        f"{address_filter.bloom.memory_bytes / 1024:.0f} KiB"
+    )
+    threading.Thread(
+        target=refresh_address_filter_forever, name="address-filter-refresh", daemon=True
+    ).start()
+
 
 # Initialize Mnemonic
 mnemo = Mnemonic("english")
 
+# Pool of pre-generated wallet keypairs (0 disables)
+WALLET_POOL_SIZE = int(os.getenv("WALLET_POOL_SIZE", 0))
+WALLET_POOL_WORKERS = int(os.getenv("WALLET_POOL_WORKERS", 0)) or None
+
+wallet_pool = None
+if WALLET_POOL_SIZE > 0:
+    wallet_pool = KeypairPool(WALLET_POOL_SIZE, workers=WALLET_POOL_WORKERS)
+    wallet_pool.start()
+    atexit.register(wallet_pool.stop)
+
 # Email configuration
 EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
 
+# Seconds to collect transfers per recipient into one digest email (0 disables)
+NOTIFICATION_DIGEST_WINDOW = float(os.getenv("NOTIFICATION_DIGEST_WINDOW", 0))
 
-def send_notification(
-    to_email, subject, transfer_amount, transfer_to_address, transfer_from_address
-):
-    # Send email notification
+
+def deliver_email(to_email, subject, text_body, html_body):
+    # Send a rendered email over SMTP
     if not EMAIL_USER or not EMAIL_PASS:
         print(f"Email notification would be sent to {to_email}: {subject}")
         return
 
-    # Create professional HTML email template
-    html_body = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Transfer Successful - CypherD Wallet</title>
-        <style>
-            body {{
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                line-height: 1.6;
-                color: #333;
-                background-color: #f4f4f4;
-                margin: 0;
-                padding: 0;
-            }}
-            .container {{
-                max-width: 600px;
-                margin: 0 auto;
-                background-color: #ffffff;
-                border-radius: 10px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                overflow: hidden;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px 20px;
-                text-align: center;
-            }}
-            .header h1 {{
-                margin: 0;
-                font-size: 28px;
-                font-weight: 300;
-            }}
-            .header .subtitle {{
-                margin: 10px 0 0 0;
-                font-size: 16px;
-                opacity: 0.9;
-            }}
-            .content {{
-                padding: 40px 30px;
-            }}
-            .success-icon {{
-                text-align: center;
-                margin-bottom: 30px;
-            }}
-            .success-icon .icon {{
-                width: 80px;
-                height: 80px;
-                background-color: #4CAF50;
-                border-radius: 50%;
-                display: inline-flex;
-                align-items: center;
-                justify-content: center;
-                font-size: 40px;
-                color: white;
-            }}
-            .transaction-details {{
-                background-color: #f8f9fa;
-                border-radius: 8px;
-                padding: 25px;
-                margin: 25px 0;
-                border-left: 4px solid #4CAF50;
-            }}
-            .detail-row:last-child {{
-                border-bottom: none;
-            }}
-            .detail-label {{
-                font-weight: 600;
-                color: #495057;
-                min-width: 120px;
-            }}
-            .detail-value {{
-                font-family: 'Courier New', monospace;
-                background-color: #ffffff;
-                padding: 8px 12px;
-                border-radius: 4px;
-                border: 1px solid #dee2e6;
-                word-break: break-all;
-                flex: 1;
-                margin-left: 15px;
-                text-align: left;
-                min-width: 0;
-                line-height: 1.4;
-            }}
-            .detail-row {{
-                display: flex;
-                align-items: flex-start;
-                padding: 12px 0;
-                border-bottom: 1px solid #e9ecef;
-                min-height: auto;
-            }}
-            .amount-highlight {{
-                font-size: 24px;
-                font-weight: bold;
-                color: #4CAF50;
-                text-align: center;
-                margin: 20px 0;
-                padding: 20px;
-                background-color: #e8f5e8;
-                border-radius: 8px;
-                border: 2px solid #4CAF50;
-            }}
-            .footer {{
-                background-color: #f8f9fa;
-                padding: 30px;
-                text-align: center;
-                border-top: 1px solid #e9ecef;
-            }}
-            .footer p {{
-                margin: 5px 0;
-                color: #6c757d;
-                font-size: 14px;
-            }}
-            .footer .logo {{
-                font-weight: bold;
-                color: #667eea;
-                font-size: 18px;
-            }}
-            .timestamp {{
-                color: #6c757d;
-                font-size: 12px;
-                text-align: center;
-                margin-top: 20px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🎉 Transfer Successful!</h1>
-                <p class="subtitle">Your transaction has been completed successfully</p>
-            </div>
-            
-            <div class="content">
-                
-                <div class="amount-highlight">
-                    {transfer_amount:.6f} ETH
-                </div>
-                
-                <div class="transaction-details">
-                    <div class="detail-row">
-                        <span class="detail-label">From:</span>
-                        <span class="detail-value">{transfer_from_address}</span>
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">To:</span>
-                        <span class="detail-value">{transfer_to_address}</span>
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Amount:</span>
-                        <span class="detail-value">{transfer_amount:.6f} ETH</span>
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Status:</span>
-                        <span class="detail-value" style="color: #4CAF50; font-weight: bold;">✅ Completed</span>
-                    </div>
-                </div>
-                
-                <p style="text-align: center; color: #6c757d; margin-top: 30px;">
-                    Your transaction has been successfully processed and recorded on the blockchain.
-                    You can view the full transaction history in your CypherD Wallet dashboard.
-                </p>
-            </div>
-            
-            <div class="footer">
-                <p class="logo">CypherD Wallet</p>
-                <p>Secure • Fast • Reliable</p>
-                <p>Thank you for using CypherD Wallet for your cryptocurrency transactions.</p>
-                <div class="timestamp">
-                    Transaction completed on {datetime.now().strftime('%B %d, %Y at %I:%M %p UTC')}
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-    # Plain text version for email clients that don't support HTML
-    text_body = f"""
-    TRANSFER SUCCESSFUL - CypherD Wallet
-    
-    Your transaction has been completed successfully!
-    
-    Transaction Details:
-    ===================
-    From: {transfer_from_address}
-    To: {transfer_to_address}
-    Amount: {transfer_amount:.6f} ETH
-    Status: ✅ Completed
-    
-    Your transaction has been successfully processed and recorded on the blockchain.
-    You can view the full transaction history in your CypherD Wallet dashboard.
-    
-    Transaction completed on {datetime.now().strftime('%B %d, %Y at %I:%M %p UTC')}
-    
-    ---
-    CypherD Wallet
-    Secure • Fast • Reliable
-    Thank you for using CypherD Wallet for your cryptocurrency transactions.
-    """
-
     try:
         msg = MIMEMultipart("alternative")
         msg["From"] = EMAIL_USER
@@ -315,6 +644,35 @@ def send_notification(
         print(f"Failed to send email: {e}")
 
 
+notification_digest = None
+if NOTIFICATION_DIGEST_WINDOW > 0:
+    notification_digest = NotificationDigest(NOTIFICATION_DIGEST_WINDOW, deliver_email)
+    atexit.register(notification_digest.flush_all)
+
+
+def send_notification(
+    to_email, subject, transfer_amount, transfer_to_address, transfer_from_address
+):
+    # Send email notification (batched per recipient when digest mode is on)
+    transfer = {
+        "amount": transfer_amount,
+        "from_address": transfer_from_address,
+        "to_address": transfer_to_address,
+        "timestamp": format_timestamp(),
+    }
+
+    if notification_digest is not None:
+        notification_digest.add(to_email, subject, transfer)
+        return
+
+    if not EMAIL_USER or not EMAIL_PASS:
+        print(f"Email notification would be sent to {to_email}: {subject}")
+        return
+
+    text_body, html_body = render_transfer(transfer)
+    deliver_email(to_email, subject, text_body, html_body)
+
+
 def get_eth_price_from_usd(usd_amount):
     # Get ETH amount from USD using Skip API
     try:
@@ -375,29 +733,29 @@ def get_current_eth_price():
 def create_wallet():
     # Create a new wallet with mnemonic phrase
     try:
-        # Generate mnemonic
-        mnemonic_phrase = mnemo.generate(strength=128)
-
-        # Enable mnemonic-based HD wallet
-        Account.enable_unaudited_hdwallet_features()
-
-        # Create account from mnemonic
-        account = Account.from_mnemonic(mnemonic_phrase)
+        # Take a pre-generated keypair, or derive one now if the pool is empty
+        keypair = wallet_pool.take() if wallet_pool is not None else None
+        if keypair is None:
+            keypair = generate_keypair()
+        mnemonic_phrase, address = keypair
 
         # Generate random initial balance (1-10 ETH)
         initial_balance = round(random.uniform(1.0, 10.0), 4)
 
         # Save to database
-        db = SessionLocal()
-        wallet = Wallet(address=account.address, balance=initial_balance)
+        db = shards.session_for(address)
+        wallet = Wallet(address=address, balance=initial_balance)
         db.add(wallet)
+        record_event(db, "wallet.created", address, balance=initial_balance)
         db.commit()
         db.close()
+        recent_writes.mark(address)
+        ledger_feed.notify()
 
         return jsonify(
             {
                 "success": True,
-                "address": account.address,
+                "address": address,
                 "mnemonic": mnemonic_phrase,
                 "balance": initial_balance,
                 "message": "Wallet created successfully",
@@ -430,7 +788,7 @@ def import_wallet():
         account = Account.from_mnemonic(mnemonic_phrase)
 
         # Check if wallet exists in database
-        db = SessionLocal()
+        db = shards.session_for(account.address)
         existing_wallet = (
             db.query(Wallet).filter(Wallet.address == account.address).first()
         )
@@ -450,8 +808,11 @@ def import_wallet():
             initial_balance = round(random.uniform(1.0, 10.0), 4)
             wallet = Wallet(address=account.address, balance=initial_balance)
             db.add(wallet)
+            record_event(db, "wallet.created", account.address, balance=initial_balance)
             db.commit()
             db.close()
+            recent_writes.mark(account.address)
+            ledger_feed.notify()
 
             return jsonify(
                 {
@@ -466,18 +827,164 @@ def import_wallet():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+# Maximum number of accounts derived in one multi-account import
+MAX_DERIVED_ACCOUNTS = int(os.getenv("MAX_DERIVED_ACCOUNTS", 100))
+
+
+def upsert_wallets(db, addresses):
+    # Insert missing wallets with a random initial balance; return
+    # ({address: balance}, [addresses this call created]). ON CONFLICT DO
+    # NOTHING lets a concurrent create of the same address win.
+    def read_balances(addresses):
+        for start in range(0, len(addresses), 500):
+            chunk = addresses[start : start + 500]
+            for address, balance in db.query(Wallet.address, Wallet.balance).filter(
+                Wallet.address.in_(chunk)
+            ):
+                balances[address] = balance
+
+    balances = {}
+    read_balances(addresses)
+
+    created = []
+    candidates = {}
+    for address in addresses:
+        if address not in balances and address not in candidates:
+            candidates[address] = round(random.uniform(1.0, 10.0), 4)
+
+    if candidates:
+        table = Wallet.__table__
+        inserted = set(
+            db.execute(
+                upsert_insert(db, table)
+                .on_conflict_do_nothing(index_elements=[table.c.address])
+                .returning(table.c.address),
+                [
+                    {"address": address, "balance": balance, "created_at": datetime.utcnow()}
+                    for address, balance in candidates.items()
+                ],
+            ).scalars()
+        )
+        # Addresses created concurrently keep the balance their creator gave them
+        read_balances([address for address in candidates if address not in inserted])
+        for address in inserted:
+            balances[address] = candidates[address]
+
+        if inserted and address_filter is not None:
+            address_filter.add(*inserted)
+        if inserted:
+            db.execute(
+                insert(LedgerEvent),
+                [
+                    {
+                        "event_type": "wallet.created",
+                        "address": address,
+                        "payload": json.dumps(
+                            {"balance": candidates[address]}, separators=(",", ":")
+                        ),
+                        "created_at": datetime.utcnow(),
+                    }
+                    for address in candidates
+                    if address in inserted
+                ],
+            )
+        created = [address for address in candidates if address in inserted]
+    return balances, created
+
+
+@app.route("/api/wallet/import/accounts", methods=["POST"])
+def import_wallet_accounts():
+    # Import a range of HD accounts derived from one mnemonic
+    try:
+        data = request.get_json()
+        mnemonic_phrase = data.get("mnemonic", "").strip()
+        start = int(data.get("start", 0))
+        count = int(data.get("count", 5))
+
+        if not mnemonic_phrase:
+            return (
+                jsonify({"success": False, "error": "Mnemonic phrase is required"}),
+                400,
+            )
+
+        if start < 0 or count < 1 or count > MAX_DERIVED_ACCOUNTS:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"Start must be non-negative and count between 1 and {MAX_DERIVED_ACCOUNTS}",
+                    }
+                ),
+                400,
+            )
+
+        # Higher indexes are hardened children, which the m/.../N path would misstate
+        if start + count > MAX_CHILD_INDEX:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"Start + count must not exceed {MAX_CHILD_INDEX}",
+                    }
+                ),
+                400,
+            )
+
+        # Validate mnemonic
+        if not mnemo.check(mnemonic_phrase):
+            return jsonify({"success": False, "error": "Invalid mnemonic phrase"}), 400
+
+        # Seed and parent node are computed once for the whole range
+        accounts = derive_addresses(mnemonic_phrase, start, count)
+
+        balances = {}
+        for index, addresses in shards.group_by_shard(
+            [address for _, _, address in accounts]
+        ).items():
+            db = shards.session_at(index)
+            shard_balances, _ = upsert_wallets(db, addresses)
+            balances.update(shard_balances)
+            db.commit()
+            db.close()
+            recent_writes.mark(*addresses)
+        ledger_feed.notify()
+
+        return jsonify(
+            {
+                "success": True,
+                "accounts": [
+                    {
+                        "index": index,
+                        "path": path,
+                        "address": address,
+                        "balance": balances[address],
+                    }
+                    for index, path, address in accounts
+                ],
+                "message": f"{len(accounts)} accounts imported successfully",
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @app.route("/api/wallet/balance/<address>", methods=["GET"])
 def get_balance(address):
     # Get wallet balance
     try:
-        db = SessionLocal()
-        wallet = db.query(Wallet).filter(Wallet.address == address).first()
-        db.close()
+        if address_filter is not None and not address_filter.might_exist(address):
+            return jsonify({"success": False, "error": "Wallet not found"}), 404
+
+        with read_engine_for(address).connect() as conn:
+            balance = conn.execute(BALANCE_QUERY, {"address": address}).scalar()
 
-        if not wallet:
+        if balance is None:
+            if address_filter is not None:
+                address_filter.record_false_positive()
             return jsonify({"success": False, "error": "Wallet not found"}), 404
 
-        return jsonify({"success": True, "address": address, "balance": wallet.balance})
+        return jsonify({"success": True, "address": address, "balance": balance})
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -497,8 +1004,9 @@ def initiate_transfer():
         if not all([from_address, to_address, amount]):
             return jsonify({"success": False, "error": "Missing required fields"}), 400
 
-        # Check if sender wallet exists
-        db = SessionLocal()
+        # Check if sender wallet exists (pending transfers live on the sender's shard)
+        sender_shard = shards.index_for(from_address)
+        db = shards.session_at(sender_shard)
         sender_wallet = db.query(Wallet).filter(Wallet.address == from_address).first()
         if not sender_wallet:
             db.close()
@@ -507,6 +1015,9 @@ def initiate_transfer():
         # Convert USD to ETH if needed
         eth_amount = float(amount)
         usd_amount = None
+        if not (math.isfinite(eth_amount) and eth_amount > 0):
+            db.close()
+            return jsonify({"success": False, "error": "Amount must be a positive number"}), 400
 
         if amount_type == "USD":
             usd_amount = float(amount)
@@ -524,6 +1035,9 @@ def initiate_transfer():
         else:
             message = f"Transfer {eth_amount:.6f} ETH to {to_address} from {from_address} at {timestamp}"
 
+        # A random nonce keeps identical transfers (and their signatures) distinct
+        message = f"{message} (nonce {secrets.token_hex(8)})"
+
         # Store pending transfer
         expires_at = datetime.utcnow() + timedelta(seconds=30)
         pending_transfer = PendingTransfer(
@@ -537,7 +1051,7 @@ def initiate_transfer():
 
         db.add(pending_transfer)
         db.commit()
-        transfer_id = pending_transfer.id
+        transfer_id = shards.encode_id(pending_transfer.id, sender_shard)
         db.close()
 
         return jsonify(
@@ -557,158 +1071,113 @@ def initiate_transfer():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-@app.route("/api/transfer/execute", methods=["POST"])
-def execute_transfer():
-    # Execute a signed transfer
-    try:
-        data = request.get_json()
-        transfer_id = data.get("transfer_id")
-        signature = data.get("signature")
-
-        if not transfer_id or not signature:
-            return (
-                jsonify(
-                    {"success": False, "error": "Missing transfer ID or signature"}
-                ),
-                400,
-            )
-
-        db = SessionLocal()
-
-        # Get pending transfer
-        pending_transfer = (
-            db.query(PendingTransfer).filter(PendingTransfer.id == transfer_id).first()
-        )
-        if not pending_transfer:
-            db.close()
-            return (
-                jsonify({"success": False, "error": "Transfer not found or expired"}),
-                404,
-            )
-
-        # Check if expired
-        if datetime.utcnow() > pending_transfer.expires_at:
-            db.delete(pending_transfer)
-            db.commit()
-            db.close()
-            return jsonify({"success": False, "error": "Transfer expired"}), 400
+# Maximum number of recipients in one multi-recipient transfer
+MAX_TRANSFER_OUTPUTS = int(os.getenv("MAX_TRANSFER_OUTPUTS", 100))
 
-        # Verify signature using EIP-191 message encoding (compatible with ethers.js v6)
-        try:
-            from eth_account.messages import encode_defunct
 
-            # Encode the message using EIP-191 standard (same as ethers.js v6)
-            encoded_message = encode_defunct(text=pending_transfer.message)
+@app.route("/api/transfer/initiate/multi", methods=["POST"])
+def initiate_multi_transfer():
+    # Initiate a transfer from one sender to many recipients; the returned
+    # message lists every (recipient, amount) pair and is signed once
+    try:
+        data = request.get_json()
+        from_address = data.get("from_address")
+        outputs = data.get("outputs") or []
 
-            # Recover the address from the signature
-            recovered_address = Account.recover_message(
-                encoded_message, signature=signature
-            )
+        if not from_address or not outputs:
+            return jsonify({"success": False, "error": "Missing required fields"}), 400
 
-            if recovered_address.lower() != pending_transfer.from_address.lower():
-                db.close()
-                return jsonify({"success": False, "error": "Invalid signature"}), 400
-        except Exception as e:
-            db.close()
+        if len(outputs) > MAX_TRANSFER_OUTPUTS:
             return (
                 jsonify(
                     {
                         "success": False,
-                        "error": f"Signature verification failed: {str(e)}",
+                        "error": f"At most {MAX_TRANSFER_OUTPUTS} recipients per transfer",
                     }
                 ),
                 400,
             )
 
-        # For USD transfers, verify price hasn't changed significantly
-        if pending_transfer.amount_usd:
-            current_eth_price = get_current_eth_price()
-            original_eth_price = pending_transfer.amount_usd / pending_transfer.amount
-            price_change_percent = (
-                abs(current_eth_price - original_eth_price) / original_eth_price * 100
-            )
-
-            if price_change_percent > 1.0:  # 1% tolerance
-                db.delete(pending_transfer)
-                db.commit()
-                db.close()
+        # Amounts are rounded to the precision shown in the signed message
+        recipients = []
+        for output in outputs:
+            to_address = output.get("to_address")
+            amount = round(float(output.get("amount") or 0), 6)
+            if not to_address or not (math.isfinite(amount) and amount > 0):
                 return (
                     jsonify(
                         {
                             "success": False,
-                            "error": "Price change too large, transaction cancelled for safety",
+                            "error": "Each output needs a to_address and a positive amount",
                         }
                     ),
                     400,
                 )
+            recipients.append((to_address, amount))
 
-        # Check balances
-        sender_wallet = (
-            db.query(Wallet)
-            .filter(Wallet.address == pending_transfer.from_address)
-            .first()
-        )
-        if sender_wallet.balance < pending_transfer.amount:
-            db.delete(pending_transfer)
-            db.commit()
-            db.close()
-            return jsonify({"success": False, "error": "Insufficient balance"}), 400
+        if len({to_address.lower() for to_address, _ in recipients}) != len(recipients):
+            return jsonify({"success": False, "error": "Duplicate recipient"}), 400
 
-        # Get or create recipient wallet
-        recipient_wallet = (
-            db.query(Wallet)
-            .filter(Wallet.address == pending_transfer.to_address)
-            .first()
-        )
-        if not recipient_wallet:
-            recipient_wallet = Wallet(address=pending_transfer.to_address, balance=0.0)
-            db.add(recipient_wallet)
-
-        # Update balances
-        sender_wallet.balance -= pending_transfer.amount
-        recipient_wallet.balance += pending_transfer.amount
-
-        # Store values before deleting the pending transfer
-        transfer_amount = pending_transfer.amount
-        transfer_to_address = pending_transfer.to_address
-        transfer_amount_usd = pending_transfer.amount_usd
-
-        # Create transaction record
-        transaction = Transaction(
-            from_address=pending_transfer.from_address,
-            to_address=pending_transfer.to_address,
-            amount=pending_transfer.amount,
-            amount_usd=pending_transfer.amount_usd,
-            status="completed",
-            signature=signature,
-        )
-        db.add(transaction)
-
-        # Remove pending transfer
-        db.delete(pending_transfer)
-        db.commit()
+        sender_shard = shards.index_for(from_address)
+        db = shards.session_at(sender_shard)
+        sender_wallet = db.query(Wallet).filter(Wallet.address == from_address).first()
+        if not sender_wallet:
+            db.close()
+            return jsonify({"success": False, "error": "Sender wallet not found"}), 404
 
-        # Store transaction ID before closing session
-        transaction_id = transaction.id
+        total = round(sum(amount for _, amount in recipients), 6)
+        if sender_wallet.balance < total:
+            db.close()
+            return jsonify({"success": False, "error": "Insufficient balance"}), 400
 
-        db.close()
+        # Create approval message: header line, then one line per recipient
+        timestamp = int(time.time())
+        message = "\n".join(
+            [
+                f"Transfer {total:.6f} ETH to {len(recipients)} recipients from {from_address} at {timestamp} (nonce {secrets.token_hex(8)})"
+            ]
+            + [f"{to_address} {amount:.6f} ETH" for to_address, amount in recipients]
+        )
 
-        # Send notification (using stored values)
-        send_notification(
-            to_email="21pc37@psgtech.ac.in",  # In real app, get from user profile
-            subject="🎉 Transfer Successful - CypherD Wallet",
-            transfer_amount=transfer_amount,
-            transfer_to_address=transfer_to_address,
-            transfer_from_address=pending_transfer.from_address,
+        # Store pending transfer (to_address is empty; recipients are its outputs)
+        expires_at = datetime.utcnow() + timedelta(seconds=30)
+        pending_transfer = PendingTransfer(
+            from_address=from_address,
+            to_address=None,
+            amount=total,
+            amount_usd=None,
+            message=message,
+            expires_at=expires_at,
         )
+        db.add(pending_transfer)
+        db.flush()
+        db.execute(
+            insert(PendingTransferOutput),
+            [
+                {
+                    "pending_transfer_id": pending_transfer.id,
+                    "to_address": to_address,
+                    "amount": amount,
+                }
+                for to_address, amount in recipients
+            ],
+        )
+        db.commit()
+        transfer_id = shards.encode_id(pending_transfer.id, sender_shard)
+        db.close()
 
         return jsonify(
             {
                 "success": True,
-                "transaction_id": transaction_id,
-                "amount": transfer_amount,
-                "amount_usd": transfer_amount_usd,
-                "message": "Transfer completed successfully",
+                "message": message,
+                "transfer_id": transfer_id,
+                "from_address": from_address,
+                "outputs": [
+                    {"to_address": to_address, "amount": amount}
+                    for to_address, amount in recipients
+                ],
+                "amount": total,
+                "expires_at": expires_at.isoformat(),
             }
         )
 
@@ -716,42 +1185,1875 @@ def execute_transfer():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-@app.route("/api/transactions/<address>", methods=["GET"])
-def get_transactions(address):
-    # Get transaction history for an address
-    try:
-        db = SessionLocal()
-        transactions = (
-            db.query(Transaction)
-            .filter(
-                (Transaction.from_address == address)
-                | (Transaction.to_address == address)
-            )
-            .order_by(Transaction.created_at.desc())
-            .all()
+def apply_transfer(db, transfer_id, signature):
+    # Move funds for an already verified pending transfer inside the caller's
+    # transaction. Returns (transfer, None) or (None, (error, status_code)).
+    pending_transfer = db.get(PendingTransfer, transfer_id)
+    if not pending_transfer:
+        return None, ("Transfer not found or expired", 404)
+    if not claim_signature(db, signature):
+        return None, ("Signature already used", 409)
+
+    # The pending transfer is used up whether or not the funds move
+    db.delete(pending_transfer)
+    return move_funds(
+        db,
+        pending_transfer.from_address,
+        pending_transfer.to_address,
+        pending_transfer.amount,
+        pending_transfer.amount_usd,
+        signature,
+    )
+
+
+def move_funds(db, from_address, to_address, amount, amount_usd, signature):
+    # Same-shard transfer of a verified, claimed signature inside the caller's transaction
+    # Check balances (NaN would pass a plain < comparison)
+    if not (math.isfinite(amount) and amount > 0):
+        return None, ("Amount must be a positive number", 400)
+    sender_wallet = db.query(Wallet).filter(Wallet.address == from_address).first()
+    if not sender_wallet:
+        return None, ("Sender wallet not found", 404)
+    if sender_wallet.balance < amount:
+        return None, ("Insufficient balance", 400)
+
+    # Get or create recipient wallet
+    recipient_wallet = db.query(Wallet).filter(Wallet.address == to_address).first()
+    if not recipient_wallet:
+        recipient_wallet = Wallet(address=to_address, balance=0.0)
+        db.add(recipient_wallet)
+        record_event(db, "wallet.created", to_address, balance=0.0)
+
+    # Update balances
+    sender_wallet.balance -= amount
+    recipient_wallet.balance += amount
+
+    # Create transaction record
+    created_at = datetime.utcnow()
+    transaction = Transaction(
+        from_address=from_address,
+        to_address=to_address,
+        amount=amount,
+        amount_usd=amount_usd,
+        status="completed",
+        signature=signature,
+        created_at=created_at,
+    )
+    db.add(transaction)
+
+    # Update per-address daily rollup
+    record_daily_volume(db, from_address, to_address, amount, created_at.date())
+    db.flush()
+
+    record_event(
+        db,
+        "transfer.completed",
+        from_address,
+        transaction_id=shards.encode_id(transaction.id, shards.index_for(from_address)),
+        from_address=from_address,
+        to_address=to_address,
+        amount=amount,
+        amount_usd=amount_usd,
+    )
+
+    return {
+        "transaction_id": transaction.id,
+        "from_address": from_address,
+        "to_address": to_address,
+        "amount": amount,
+        "amount_usd": amount_usd,
+    }, None
+
+
+def prepare_cross_shard_transfer(db, transfer_id, signature):
+    # Phase 1 of a cross-shard transfer, inside the sender shard's transaction:
+    # debit the sender atomically and record a "prepared" transaction.
+    pending_transfer = db.get(PendingTransfer, transfer_id)
+    if not pending_transfer:
+        return None, ("Transfer not found or expired", 404)
+    if not claim_signature(db, signature):
+        return None, ("Signature already used", 409)
+
+    db.delete(pending_transfer)
+    return debit_for_cross_shard(
+        db,
+        pending_transfer.from_address,
+        pending_transfer.to_address,
+        pending_transfer.amount,
+        pending_transfer.amount_usd,
+        signature,
+    )
+
+
+def debit_for_cross_shard(db, from_address, to_address, amount, amount_usd, signature):
+    # Debit the sender atomically and record a "prepared" transaction
+    if not (math.isfinite(amount) and amount > 0):
+        return None, ("Amount must be a positive number", 400)
+    debited = db.execute(
+        update(Wallet)
+        .where(Wallet.address == from_address, Wallet.balance >= amount)
+        .values(balance=Wallet.balance - amount)
+    ).rowcount
+    if not debited:
+        return None, ("Insufficient balance", 400)
+
+    created_at = datetime.utcnow()
+    transaction = Transaction(
+        from_address=from_address,
+        to_address=to_address,
+        amount=amount,
+        amount_usd=amount_usd,
+        status="prepared",
+        signature=signature,
+        created_at=created_at,
+    )
+    db.add(transaction)
+    record_address_volume(db, from_address, "sent", amount, created_at.date())
+    db.flush()
+
+    return {
+        "transaction_id": transaction.id,
+        "from_address": transaction.from_address,
+        "to_address": transaction.to_address,
+        "amount": transaction.amount,
+        "amount_usd": transaction.amount_usd,
+    }, None
+
+
+def apply_cross_shard_transfer(sender_shard, transfer_id, signature):
+    # Two-phase transfer between shards. Phase 1 durably debits the sender and
+    # records a "prepared" transaction on the sender's shard; phase 2 credits the
+    # recipient's shard and marks the record completed. Interrupted transfers are
+    # finished by recover_prepared_transfers(), which run.py calls at startup.
+    if group_commit_writers is not None:
+        transfer, error = (
+            group_commit_writers[sender_shard]
+            .submit(transfer_id, signature, apply=prepare_cross_shard_transfer)
+            .result()
         )
-        db.close()
+    else:
+        db = shards.session_at(sender_shard)
+        try:
+            transfer, error = prepare_cross_shard_transfer(db, transfer_id, signature)
+            db.commit()
+        finally:
+            db.close()
 
-        transaction_list = []
-        for tx in transactions:
-            transaction_list.append(
-                {
-                    "id": tx.id,
-                    "from_address": tx.from_address,
-                    "to_address": tx.to_address,
-                    "amount": tx.amount,
-                    "amount_usd": tx.amount_usd,
-                    "status": tx.status,
-                    "created_at": tx.created_at.isoformat(),
-                    "type": (
-                        "sent"
-                        if tx.from_address.lower() == address.lower()
-                        else "received"
-                    ),
-                }
+    if error:
+        return None, error
+
+    if not finish_cross_shard_transfer(sender_shard, transfer["transaction_id"]):
+        transfer["status"] = "prepared"
+    return transfer, None
+
+
+# Seconds between background retries of an unfinished phase 2 (doubling up to the max)
+CROSS_SHARD_RETRY_SECONDS = float(os.getenv("CROSS_SHARD_RETRY_SECONDS", 1))
+CROSS_SHARD_RETRY_MAX_SECONDS = float(os.getenv("CROSS_SHARD_RETRY_MAX_SECONDS", 60))
+PREPARED_TRANSFER_MESSAGE = "Transfer accepted; the recipient will be credited shortly"
+
+
+def finish_cross_shard_transfer(sender_shard, transaction_id):
+    # Run phase 2 now; if it fails, the sender is already debited, so keep
+    # retrying in the background instead of failing the request. True if done.
+    try:
+        complete_cross_shard_transfer(sender_shard, transaction_id)
+        return True
+    except Exception as e:
+        print(f"Cross-shard transfer {transaction_id} on shard {sender_shard} not completed: {e}")
+        threading.Thread(
+            target=retry_cross_shard_transfer,
+            args=(sender_shard, transaction_id),
+            name="cross-shard-retry",
+            daemon=True,
+        ).start()
+        return False
+
+
+def retry_cross_shard_transfer(sender_shard, transaction_id):
+    # Background retry with exponential backoff until phase 2 succeeds
+    delay = CROSS_SHARD_RETRY_SECONDS
+    while True:
+        time.sleep(delay)
+        try:
+            complete_cross_shard_transfer(sender_shard, transaction_id)
+            ledger_feed.notify()
+            return
+        except Exception as e:
+            print(f"Retrying cross-shard transfer {transaction_id} on shard {sender_shard}: {e}")
+            delay = min(delay * 2, CROSS_SHARD_RETRY_MAX_SECONDS)
+
+
+def complete_cross_shard_transfer(sender_shard, transaction_id):
+    # Phase 2: credit the recipient shard (idempotent), then mark the sender record completed
+    db = shards.session_at(sender_shard)
+    try:
+        transaction = db.get(Transaction, transaction_id)
+        if transaction is None or transaction.status != "prepared":
+            return
+
+        # The credit claims a key on the recipient shard in its own commit, so a
+        # retry or a concurrent recovery can never credit the recipient twice
+        credit_key = hashlib.sha256(
+            f"credit:{transaction.to_address.lower()}:{transaction.signature}".encode()
+        ).hexdigest()
+        recipient_db = shards.session_for(transaction.to_address)
+        try:
+            if claim_fingerprint(recipient_db, credit_key):
+                credited = recipient_db.execute(
+                    update(Wallet)
+                    .where(Wallet.address == transaction.to_address)
+                    .values(balance=Wallet.balance + transaction.amount)
+                ).rowcount
+                if not credited:
+                    # Like move_funds: the wallet opens at 0 and the transfer credits it
+                    recipient_db.add(Wallet(address=transaction.to_address, balance=0.0))
+                    record_event(
+                        recipient_db,
+                        "wallet.created",
+                        transaction.to_address,
+                        balance=0.0,
+                    )
+                    recipient_db.flush()
+                    recipient_db.execute(
+                        update(Wallet)
+                        .where(Wallet.address == transaction.to_address)
+                        .values(balance=Wallet.balance + transaction.amount)
+                    )
+
+                # Mirror record so the recipient's history stays on its own shard
+                recipient_db.add(
+                    Transaction(
+                        from_address=transaction.from_address,
+                        to_address=transaction.to_address,
+                        amount=transaction.amount,
+                        amount_usd=transaction.amount_usd,
+                        status="completed",
+                        signature=transaction.signature,
+                        created_at=transaction.created_at,
+                    )
+                )
+                record_address_volume(
+                    recipient_db,
+                    transaction.to_address,
+                    "received",
+                    transaction.amount,
+                    transaction.created_at.date(),
+                )
+                recipient_db.commit()
+        finally:
+            recipient_db.close()
+
+        # The transfer's event goes to the sender shard's log with the status
+        # change, written only by whichever of phase 2 and recovery completes it
+        completed = db.execute(
+            update(Transaction)
+            .where(Transaction.id == transaction.id, Transaction.status == "prepared")
+            .values(status="completed")
+        ).rowcount
+        if completed:
+            record_event(
+                db,
+                "transfer.completed",
+                transaction.from_address,
+                transaction_id=shards.encode_id(transaction.id, sender_shard),
+                from_address=transaction.from_address,
+                to_address=transaction.to_address,
+                amount=transaction.amount,
+                amount_usd=transaction.amount_usd,
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def prepare_multi_transfer(db, transfer_id, signature):
+    # Apply a verified multi-recipient transfer inside the sender shard's
+    # transaction: one debit for the total, bulk credits and transaction rows
+    # for recipients on this shard, and "prepared" rows for recipients on other
+    # shards (finished by complete_cross_shard_transfer).
+    pending_transfer = db.get(PendingTransfer, transfer_id)
+    if not pending_transfer:
+        return None, ("Transfer not found or expired", 404)
+    if not claim_signature(db, signature):
+        return None, ("Signature already used", 409)
+
+    outputs = (
+        db.query(PendingTransferOutput.to_address, PendingTransferOutput.amount)
+        .filter(PendingTransferOutput.pending_transfer_id == transfer_id)
+        .order_by(PendingTransferOutput.id)
+        .all()
+    )
+    from_address = pending_transfer.from_address
+    total = pending_transfer.amount
+
+    def discard_pending():
+        db.query(PendingTransferOutput).filter(
+            PendingTransferOutput.pending_transfer_id == transfer_id
+        ).delete(synchronize_session=False)
+        db.delete(pending_transfer)
+
+    debited = db.execute(
+        update(Wallet)
+        .where(Wallet.address == from_address, Wallet.balance >= total)
+        .values(balance=Wallet.balance - total)
+    ).rowcount
+    if not debited:
+        discard_pending()
+        return None, ("Insufficient balance", 400)
+
+    sender_shard = shards.index_for(from_address)
+    local_outputs = [
+        (to_address, amount)
+        for to_address, amount in outputs
+        if shards.index_for(to_address) == sender_shard
+    ]
+
+    if local_outputs:
+        # Create missing recipient wallets, then credit all recipients in one executemany
+        local_addresses = [to_address for to_address, _ in local_outputs]
+        existing = {
+            address
+            for (address,) in db.query(Wallet.address).filter(
+                Wallet.address.in_(local_addresses)
+            )
+        }
+        missing = [address for address in local_addresses if address not in existing]
+        if missing:
+            db.execute(
+                insert(Wallet), [{"address": address, "balance": 0.0} for address in missing]
+            )
+            for address in missing:
+                record_event(db, "wallet.created", address, balance=0.0)
+
+        wallets = Wallet.__table__
+        db.execute(
+            update(wallets)
+            .where(wallets.c.address == bindparam("credit_address"))
+            .values(balance=wallets.c.balance + bindparam("credit_amount")),
+            [
+                {"credit_address": to_address, "credit_amount": amount}
+                for to_address, amount in local_outputs
+            ],
+        )
+
+    created_at = datetime.utcnow()
+    transaction_ids = db.execute(
+        insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+        [
+            {
+                "from_address": from_address,
+                "to_address": to_address,
+                "amount": amount,
+                "amount_usd": None,
+                "status": "completed"
+                if shards.index_for(to_address) == sender_shard
+                else "prepared",
+                "signature": signature,
+                "created_at": created_at,
+            }
+            for to_address, amount in outputs
+        ],
+    ).scalars().all()
+
+    prepared_ids = []
+    for transaction_id, (to_address, amount) in zip(transaction_ids, outputs):
+        record_address_volume(db, from_address, "sent", amount, created_at.date())
+        if shards.index_for(to_address) != sender_shard:
+            prepared_ids.append(transaction_id)
+            continue
+        record_address_volume(db, to_address, "received", amount, created_at.date())
+        record_event(
+            db,
+            "transfer.completed",
+            from_address,
+            transaction_id=shards.encode_id(transaction_id, sender_shard),
+            from_address=from_address,
+            to_address=to_address,
+            amount=amount,
+            amount_usd=None,
+        )
+
+    discard_pending()
+    db.flush()
+
+    return {
+        "transaction_id": transaction_ids[0],
+        "transaction_ids": transaction_ids,
+        "prepared_ids": prepared_ids,
+        "from_address": from_address,
+        "to_address": None,
+        "to_addresses": [to_address for to_address, _ in outputs],
+        "amount": total,
+        "amount_usd": None,
+    }, None
+
+
+def apply_multi_transfer(sender_shard, transfer_id, signature):
+    # Multi-recipient transfer: phase 1 on the sender shard (through its
+    # group-commit writer when enabled), then phase 2 for each recipient
+    # that lives on another shard
+    if group_commit_writers is not None:
+        transfer, error = (
+            group_commit_writers[sender_shard]
+            .submit(transfer_id, signature, apply=prepare_multi_transfer)
+            .result()
+        )
+    else:
+        db = shards.session_at(sender_shard)
+        try:
+            transfer, error = prepare_multi_transfer(db, transfer_id, signature)
+            db.commit()
+        finally:
+            db.close()
+
+    if error:
+        return None, error
+
+    for transaction_id in transfer["prepared_ids"]:
+        if not finish_cross_shard_transfer(sender_shard, transaction_id):
+            transfer["status"] = "prepared"
+    return transfer, None
+
+
+def recover_prepared_transfers():
+    # Finish cross-shard transfers interrupted between the two phases
+    def prepared_ids(index, db):
+        return [
+            row.id
+            for row in db.query(Transaction.id).filter(Transaction.status == "prepared")
+        ]
+
+    recovered = 0
+    for index, transaction_ids in enumerate(shards.fan_out(prepared_ids)):
+        for transaction_id in transaction_ids:
+            if finish_cross_shard_transfer(index, transaction_id):
+                recovered += 1
+    return recovered
+
+
+# Group commit: apply verified transfers in micro-batches from one writer thread per shard
+GROUP_COMMIT = os.getenv("GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", 64))
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", 5))
+
+group_commit_writers = None
+if GROUP_COMMIT:
+    group_commit_writers = [
+        GroupCommitWriter(
+            shard_sessionmaker,
+            apply_transfer,
+            max_batch=GROUP_COMMIT_MAX_BATCH,
+            max_delay=GROUP_COMMIT_MAX_DELAY_MS / 1000,
+        )
+        for shard_sessionmaker in shards.sessionmakers
+    ]
+    for writer in group_commit_writers:
+        writer.start()
+
+
+# Fingerprints of recently used signatures, checked before any database work
+RECENT_SIGNATURE_CACHE_SIZE = int(os.getenv("RECENT_SIGNATURE_CACHE_SIZE", 10000))
+recent_signatures = RecentSignatureFilter(RECENT_SIGNATURE_CACHE_SIZE)
+
+
+@app.route("/api/transfer/execute", methods=["POST"])
+def execute_transfer():
+    # Execute a signed transfer
+    try:
+        data = request.get_json()
+        transfer_id = data.get("transfer_id")
+        signature = data.get("signature")
+
+        if not transfer_id or not signature:
+            return (
+                jsonify(
+                    {"success": False, "error": "Missing transfer ID or signature"}
+                ),
+                400,
+            )
+
+        # Reject hot replays without touching the database
+        try:
+            fingerprint = signature_fingerprint(signature)
+        except ValueError as e:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"Signature verification failed: {str(e)}",
+                    }
+                ),
+                400,
+            )
+        if fingerprint in recent_signatures:
+            return jsonify({"success": False, "error": "Signature already used"}), 409
+
+        # Pending transfers live on the sender's shard, encoded in the transfer ID
+        sender_shard, transfer_id = shards.decode_id(transfer_id)
+        db = shards.session_at(sender_shard)
+
+        # Get pending transfer
+        pending_transfer = (
+            db.query(PendingTransfer).filter(PendingTransfer.id == transfer_id).first()
+        )
+        if not pending_transfer:
+            db.close()
+            return (
+                jsonify({"success": False, "error": "Transfer not found or expired"}),
+                404,
+            )
+
+        # Check if expired
+        if datetime.utcnow() > pending_transfer.expires_at:
+            db.query(PendingTransferOutput).filter(
+                PendingTransferOutput.pending_transfer_id == transfer_id
+            ).delete(synchronize_session=False)
+            db.delete(pending_transfer)
+            db.commit()
+            db.close()
+            return jsonify({"success": False, "error": "Transfer expired"}), 400
+
+        # Verify signature using EIP-191 message encoding (compatible with ethers.js v6)
+        try:
+            # Recover the address from the signature
+            recovered_address = recover_message_address(
+                pending_transfer.message, signature
+            )
+
+            if recovered_address.lower() != pending_transfer.from_address.lower():
+                db.close()
+                return jsonify({"success": False, "error": "Invalid signature"}), 400
+        except Exception as e:
+            db.close()
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"Signature verification failed: {str(e)}",
+                    }
+                ),
+                400,
+            )
+
+        # For USD transfers, verify price hasn't changed significantly
+        if pending_transfer.amount_usd:
+            current_eth_price = get_current_eth_price()
+            original_eth_price = pending_transfer.amount_usd / pending_transfer.amount
+            price_change_percent = (
+                abs(current_eth_price - original_eth_price) / original_eth_price * 100
+            )
+
+            if price_change_percent > 1.0:  # 1% tolerance
+                db.delete(pending_transfer)
+                db.commit()
+                db.close()
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "error": "Price change too large, transaction cancelled for safety",
+                        }
+                    ),
+                    400,
+                )
+
+        # Apply the verified transfer (through the group-commit writer when enabled)
+        if pending_transfer.to_address is None:
+            db.close()
+            transfer, error = apply_multi_transfer(sender_shard, transfer_id, signature)
+        elif shards.index_for(pending_transfer.to_address) != sender_shard:
+            db.close()
+            transfer, error = apply_cross_shard_transfer(
+                sender_shard, transfer_id, signature
+            )
+        elif group_commit_writers is not None:
+            db.close()
+            transfer, error = (
+                group_commit_writers[sender_shard].submit(transfer_id, signature).result()
+            )
+        else:
+            transfer, error = apply_transfer(db, transfer_id, signature)
+            db.commit()
+            db.close()
+
+        if error:
+            if error[1] == 409:
+                recent_signatures.add(fingerprint)
+            return jsonify({"success": False, "error": error[0]}), error[1]
+
+        recent_signatures.add(fingerprint)
+        to_addresses = transfer.get("to_addresses") or [transfer["to_address"]]
+        recent_writes.mark(transfer["from_address"], *to_addresses)
+        ledger_feed.notify()
+
+        # Send notification (using stored values)
+        send_notification(
+            to_email="21pc37@psgtech.ac.in",  # In real app, get from user profile
+            subject="🎉 Transfer Successful - CypherD Wallet",
+            transfer_amount=transfer["amount"],
+            transfer_to_address=transfer["to_address"] or f"{len(to_addresses)} recipients",
+            transfer_from_address=transfer["from_address"],
+        )
+
+        status = transfer.get("status", "completed")
+        result = {
+            "success": True,
+            "transaction_id": shards.encode_id(transfer["transaction_id"], sender_shard),
+            "amount": transfer["amount"],
+            "amount_usd": transfer["amount_usd"],
+            "status": status,
+            "message": "Transfer completed successfully"
+            if status == "completed"
+            else PREPARED_TRANSFER_MESSAGE,
+        }
+        if "transaction_ids" in transfer:
+            result["transaction_ids"] = [
+                shards.encode_id(transaction_id, sender_shard)
+                for transaction_id in transfer["transaction_ids"]
+            ]
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# Longest allowed lifetime of a signed transfer intent
+INTENT_MAX_TTL_SECONDS = int(os.getenv("INTENT_MAX_TTL_SECONDS", 300))
+
+
+def apply_intent(db, from_address, to_address, amount, nonce, signature, cross_shard):
+    # Claim the signature and the sender's nonce, then move funds (or debit
+    # for a cross-shard transfer) in the sender shard's transaction
+    if not claim_signature(db, signature):
+        return None, ("Signature already used", 409)
+    nonce_key = hashlib.sha256(f"intent:{from_address.lower()}:{nonce}".encode()).hexdigest()
+    if not claim_fingerprint(db, nonce_key):
+        return None, ("Intent nonce already used", 409)
+
+    if cross_shard:
+        if not db.query(Wallet.id).filter(Wallet.address == from_address).first():
+            return None, ("Sender wallet not found", 404)
+        return debit_for_cross_shard(db, from_address, to_address, amount, None, signature)
+    return move_funds(db, from_address, to_address, amount, None, signature)
+
+
+@app.route("/api/transfer/submit", methods=["POST"])
+def submit_transfer_intent():
+    # Execute a client-built, signed transfer intent in one round trip: no
+    # pending transfer is stored, the signature covers the whole intent
+    try:
+        data = request.get_json()
+        intent = data.get("intent") or {}
+        signature = data.get("signature")
+
+        if not intent or not signature:
+            return jsonify({"success": False, "error": "Missing intent or signature"}), 400
+
+        try:
+            from_address, to_address, amount, nonce, _, message = parse_intent(
+                intent, INTENT_MAX_TTL_SECONDS
+            )
+            fingerprint = signature_fingerprint(signature)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        if fingerprint in recent_signatures:
+            return jsonify({"success": False, "error": "Signature already used"}), 409
+
+        # Verify signature over the canonical intent text
+        try:
+            recovered_address = recover_message_address(message, signature)
+            if recovered_address.lower() != from_address.lower():
+                return jsonify({"success": False, "error": "Invalid signature"}), 400
+        except Exception as e:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"Signature verification failed: {str(e)}",
+                    }
+                ),
+                400,
+            )
+
+        sender_shard = shards.index_for(from_address)
+        cross_shard = shards.index_for(to_address) != sender_shard
+        args = (from_address, to_address, amount, nonce, signature, cross_shard)
+        if group_commit_writers is not None:
+            transfer, error = (
+                group_commit_writers[sender_shard].submit(*args, apply=apply_intent).result()
+            )
+        else:
+            db = shards.session_at(sender_shard)
+            try:
+                transfer, error = apply_intent(db, *args)
+                db.commit()
+            finally:
+                db.close()
+
+        if error:
+            if error[1] == 409:
+                recent_signatures.add(fingerprint)
+            return jsonify({"success": False, "error": error[0]}), error[1]
+
+        status = "completed"
+        if cross_shard and not finish_cross_shard_transfer(
+            sender_shard, transfer["transaction_id"]
+        ):
+            status = "prepared"
+
+        recent_signatures.add(fingerprint)
+        recent_writes.mark(from_address, to_address)
+        ledger_feed.notify()
+
+        send_notification(
+            to_email="21pc37@psgtech.ac.in",  # In real app, get from user profile
+            subject="🎉 Transfer Successful - CypherD Wallet",
+            transfer_amount=amount,
+            transfer_to_address=to_address,
+            transfer_from_address=from_address,
+        )
+
+        return jsonify(
+            {
+                "success": True,
+                "transaction_id": shards.encode_id(transfer["transaction_id"], sender_shard),
+                "amount": amount,
+                "amount_usd": None,
+                "status": status,
+                "message": "Transfer completed successfully"
+                if status == "completed"
+                else PREPARED_TRANSFER_MESSAGE,
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# Scheduled transfers: the sender signs one authorization, the scheduler runs it
+SCHEDULER = os.getenv("SCHEDULER", "false").lower() in ("1", "true", "yes")
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", 1))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", 200))
+SCHEDULE_MIN_INTERVAL_SECONDS = int(os.getenv("SCHEDULE_MIN_INTERVAL_SECONDS", 60))
+SCHEDULE_MAX_START_DELAY_SECONDS = int(os.getenv("SCHEDULE_MAX_START_DELAY_SECONDS", 31536000))
+
+
+def schedule_to_dict(schedule, shard):
+    return {
+        "schedule_id": shards.encode_id(schedule.id, shard),
+        "from_address": schedule.from_address,
+        "to_address": schedule.to_address,
+        "amount": schedule.amount,
+        "interval_seconds": schedule.interval_seconds,
+        "remaining": schedule.remaining,
+        "runs": schedule.runs,
+        "next_run_at": schedule.next_run_at.isoformat(),
+        "status": schedule.status,
+        "last_error": schedule.last_error,
+    }
+
+
+@app.route("/api/schedules", methods=["POST"])
+def create_schedule():
+    # Register a signed one-off or recurring transfer for the scheduler
+    try:
+        data = request.get_json()
+        schedule = data.get("schedule") or {}
+        signature = data.get("signature")
+
+        if not schedule or not signature:
+            return jsonify({"success": False, "error": "Missing schedule or signature"}), 400
+
+        try:
+            (
+                from_address,
+                to_address,
+                amount,
+                start_at,
+                interval_seconds,
+                occurrences,
+                message,
+            ) = parse_schedule(
+                schedule, SCHEDULE_MIN_INTERVAL_SECONDS, SCHEDULE_MAX_START_DELAY_SECONDS
+            )
+            recovered_address = recover_message_address(message, signature)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        except Exception as e:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"Signature verification failed: {str(e)}",
+                    }
+                ),
+                400,
+            )
+        if recovered_address.lower() != from_address.lower():
+            return jsonify({"success": False, "error": "Invalid signature"}), 400
+
+        shard = shards.index_for(from_address)
+        db = shards.session_at(shard)
+        try:
+            if not db.query(Wallet.id).filter(Wallet.address == from_address).first():
+                return jsonify({"success": False, "error": "Sender wallet not found"}), 404
+            if not claim_signature(db, signature):
+                return jsonify({"success": False, "error": "Signature already used"}), 409
+
+            scheduled = ScheduledTransfer(
+                from_address=from_address,
+                to_address=to_address,
+                amount=amount,
+                interval_seconds=interval_seconds,
+                remaining=occurrences or None,
+                next_run_at=datetime.utcfromtimestamp(start_at),
+                signature=signature,
+            )
+            db.add(scheduled)
+            db.commit()
+            result = schedule_to_dict(scheduled, shard)
+        finally:
+            db.close()
+
+        return jsonify(dict(result, success=True))
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/api/schedules/<address>", methods=["GET"])
+def list_schedules(address):
+    # Scheduled transfers created by an address
+    try:
+        shard = shards.index_for(address)
+        db = read_session_for(address)
+        try:
+            schedules = (
+                db.query(ScheduledTransfer)
+                .filter(ScheduledTransfer.from_address == address)
+                .order_by(ScheduledTransfer.next_run_at)
+                .all()
             )
+            result = [schedule_to_dict(schedule, shard) for schedule in schedules]
+        finally:
+            db.close()
+        return jsonify({"success": True, "schedules": result})
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/api/schedules/<int:schedule_id>/cancel", methods=["POST"])
+def cancel_schedule(schedule_id):
+    # Cancel a scheduled transfer; the sender signs cancel_schedule_message(id)
+    try:
+        data = request.get_json()
+        signature = data.get("signature")
+        if not signature:
+            return jsonify({"success": False, "error": "Missing signature"}), 400
+
+        shard, local_id = shards.decode_id(schedule_id)
+        db = shards.session_at(shard)
+        try:
+            schedule = db.get(ScheduledTransfer, local_id)
+            if not schedule:
+                return jsonify({"success": False, "error": "Schedule not found"}), 404
+
+            try:
+                recovered_address = recover_message_address(
+                    cancel_schedule_message(schedule_id), signature
+                )
+            except Exception as e:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "error": f"Signature verification failed: {str(e)}",
+                        }
+                    ),
+                    400,
+                )
+            if recovered_address.lower() != schedule.from_address.lower():
+                return jsonify({"success": False, "error": "Invalid signature"}), 400
+
+            if schedule.status == "active":
+                schedule.status = "cancelled"
+                db.commit()
+            result = schedule_to_dict(schedule, shard)
+        finally:
+            db.close()
+
+        return jsonify(dict(result, success=True))
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def run_schedule(db, schedule, shard_index, now):
+    # Apply one due run of a schedule and advance it; returns (transfer, cross_shard).
+    # After downtime only the latest missed occurrence is paid; earlier ones are skipped
+    missed = 0
+    if schedule.interval_seconds:
+        missed = int((now - schedule.next_run_at).total_seconds() // schedule.interval_seconds)
+        if schedule.remaining is not None:
+            missed = min(missed, schedule.remaining - 1)
+    run = schedule.runs + missed + 1
+    # A per-run signature keeps each occurrence's cross-shard mirror row distinct
+    signature = f"{schedule.signature}#{run}"
+    cross_shard = shards.index_for(schedule.to_address) != shard_index
+    if cross_shard:
+        transfer, error = debit_for_cross_shard(
+            db, schedule.from_address, schedule.to_address, schedule.amount, None, signature
+        )
+    else:
+        transfer, error = move_funds(
+            db, schedule.from_address, schedule.to_address, schedule.amount, None, signature
+        )
+
+    # A failed run (e.g. insufficient balance) is skipped, not retried
+    schedule.runs = run
+    if error:
+        schedule.last_error = error[0]
+    elif missed:
+        schedule.last_error = f"Skipped {missed} missed runs"
+    else:
+        schedule.last_error = None
+    if schedule.remaining is not None:
+        schedule.remaining -= missed + 1
+    if schedule.interval_seconds == 0 or schedule.remaining == 0:
+        schedule.status = "completed"
+    else:
+        schedule.next_run_at += timedelta(seconds=schedule.interval_seconds * (missed + 1))
+    return transfer, cross_shard
+
+
+def run_due_schedules(db, shard_index, now, limit):
+    # Apply up to `limit` due scheduled transfers of one shard inside one
+    # transaction; returns (rows processed, [(transfer, cross_shard)]) for the
+    # runs that moved funds. The next_run_at index is the scheduler's queue;
+    # rows another scheduler has locked are left to it (PostgreSQL).
+    open_transaction(db)
+    due = (
+        db.query(ScheduledTransfer)
+        .filter(ScheduledTransfer.status == "active", ScheduledTransfer.next_run_at <= now)
+        .order_by(ScheduledTransfer.next_run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    applied = []
+    for schedule in due:
+        # Each run gets a savepoint: a row that raises is marked failed and
+        # rolled back alone, and the rest of the batch still commits
+        try:
+            with db.begin_nested():
+                transfer, cross_shard = run_schedule(db, schedule, shard_index, now)
+        except Exception as e:
+            print(f"Scheduled transfer {schedule.id} failed: {e}")
+            schedule.status = "failed"
+            schedule.last_error = str(e)
+            continue
+        if transfer:
+            applied.append((transfer, cross_shard))
+
+    db.flush()
+    return len(due), applied
+
+
+def run_scheduler_tick():
+    # Apply every transfer due now, in batches of SCHEDULER_BATCH_SIZE per commit
+    now = datetime.utcnow()
+    total = 0
+    for index in range(shards.count):
+        while True:
+            if group_commit_writers is not None:
+                count, applied = (
+                    group_commit_writers[index]
+                    .submit(index, now, SCHEDULER_BATCH_SIZE, apply=run_due_schedules)
+                    .result()
+                )
+            else:
+                db = shards.session_at(index)
+                try:
+                    count, applied = run_due_schedules(db, index, now, SCHEDULER_BATCH_SIZE)
+                    db.commit()
+                finally:
+                    db.close()
+
+            for transfer, cross_shard in applied:
+                if cross_shard:
+                    finish_cross_shard_transfer(index, transfer["transaction_id"])
+                recent_writes.mark(transfer["from_address"], transfer["to_address"])
+            if applied:
+                ledger_feed.notify()
+            total += len(applied)
+            if count < SCHEDULER_BATCH_SIZE:
+                break
+    return total
+
+
+def run_scheduler_forever():
+    # Scheduler thread: one tick every SCHEDULER_TICK_SECONDS
+    while True:
+        started = time.monotonic()
+        try:
+            run_scheduler_tick()
+        except Exception as e:
+            print(f"Scheduler tick failed: {e}")
+        time.sleep(max(0.0, SCHEDULER_TICK_SECONDS - (time.monotonic() - started)))
+
+
+def start_scheduler():
+    # Called by the server entry point, so imports (CLIs, tests) never run schedules
+    if SCHEDULER:
+        threading.Thread(
+            target=run_scheduler_forever, name="transfer-scheduler", daemon=True
+        ).start()
+
+
+# Most recent transactions returned by one history call
+MAX_HISTORY_ROWS = int(os.getenv("MAX_HISTORY_ROWS", 500))
+
+
+@app.route("/api/transactions/<address>", methods=["GET"])
+def get_transactions(address):
+    # Get the newest `limit` transactions of an address (cross-shard transfers
+    # are mirrored onto the recipient's shard, so one shard holds the whole
+    # history). Archived rows are all older than the hot ones, so cold storage
+    # is only read when the hot rows do not fill the page and the requested
+    # window reaches back past the archive boundary.
+    try:
+        since = request.args.get("since")
+        since = datetime.fromisoformat(since) if since else None
+        limit = min(max(request.args.get("limit", MAX_HISTORY_ROWS, type=int), 1), MAX_HISTORY_ROWS)
+
+        # Unknown addresses have no history; answer without a query
+        if address_filter is not None and not address_filter.might_exist(address):
+            return jsonify({"success": True, "transactions": [], "high_water_mark": 0})
+
+        shard = shards.index_for(address)
+        with read_engine_for(address).connect() as conn:
+            if since:
+                rows = conn.execute(
+                    HISTORY_SINCE_QUERY,
+                    {"address": address, "since": since, "limit": limit + 1},
+                ).all()
+            else:
+                rows = conn.execute(HISTORY_QUERY, {"address": address, "limit": limit + 1}).all()
+
+        boundary = archive.archived_before(ARCHIVE_DIR, shard)
+        reaches_archive = boundary is not None and (since is None or since < boundary)
+        # A full page of hot rows is newer than anything archived
+        archive_skipped = reaches_archive and len(rows) >= limit
+        if reaches_archive and not archive_skipped:
+            hot_ids = {row[0] for row in rows}
+            rows.extend(
+                (
+                    tx["id"],
+                    tx["from_address"],
+                    tx["to_address"],
+                    tx["amount"],
+                    tx["amount_usd"],
+                    tx["status"],
+                    tx["created_at"],
+                )
+                for tx in archive.read_archived_transactions(
+                    ARCHIVE_DIR, shard, address, since
+                )
+                if tx["id"] not in hot_ids
+            )
+            rows.sort(key=lambda row: row[6], reverse=True)
+
+        has_more = len(rows) > limit or archive_skipped
+        rows = rows[:limit]
+
+        lower_address = address.lower()
+        transaction_list = [
+            {
+                "id": shards.encode_id(tx_id, shard),
+                "from_address": from_address,
+                "to_address": to_address,
+                "amount": amount,
+                "amount_usd": amount_usd,
+                "status": status,
+                "created_at": created_at.isoformat(),
+                "type": "sent" if from_address.lower() == lower_address else "received",
+            }
+            for tx_id, from_address, to_address, amount, amount_usd, status, created_at in rows
+        ]
+
+        # Starting point for /delta: just below the first unfinished transfer, if any
+        prepared_ids = [row[0] for row in rows if row[5] == "prepared"]
+        if prepared_ids:
+            high_water_mark = shards.encode_id(min(prepared_ids) - 1, shard)
+        else:
+            high_water_mark = shards.encode_id(max((row[0] for row in rows), default=0), shard)
+
+        return jsonify(
+            {
+                "success": True,
+                "transactions": transaction_list,
+                "high_water_mark": high_water_mark,
+                "has_more": has_more,
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# Maximum rows returned by one delta-sync call
+MAX_DELTA_ROWS = int(os.getenv("MAX_DELTA_ROWS", 500))
+
+
+@app.route("/api/transactions/<address>/delta", methods=["GET"])
+def get_transactions_delta(address):
+    # Get only transactions committed after a high-water mark. Clients keep a
+    # local copy, pass back high_water_mark as since_id, and repeat while
+    # has_more is true.
+    try:
+        since_id = request.args.get("since_id", 0, type=int)
+        limit = min(max(request.args.get("limit", MAX_DELTA_ROWS, type=int), 1), MAX_DELTA_ROWS)
+
+        if address_filter is not None and not address_filter.might_exist(address):
+            return jsonify(
+                {
+                    "success": True,
+                    "transactions": [],
+                    "high_water_mark": since_id,
+                    "has_more": False,
+                }
+            )
+
+        shard = shards.index_for(address)
+        local_since_id = shards.decode_id(since_id)[1] if since_id > 0 else 0
+        with read_engine_for(address).connect() as conn:
+            rows = conn.execute(
+                HISTORY_DELTA_QUERY,
+                {"address": address, "since_id": local_since_id, "limit": limit + 1},
+            ).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Stop before an unfinished cross-shard transfer so it is re-sent once completed
+        for position, row in enumerate(rows):
+            if row[5] == "prepared":
+                rows = rows[:position]
+                has_more = True
+                break
+
+        high_water_mark = shards.encode_id(rows[-1][0], shard) if rows else since_id
+        lower_address = address.lower()
+        transaction_list = [
+            {
+                "id": shards.encode_id(tx_id, shard),
+                "from_address": from_address,
+                "to_address": to_address,
+                "amount": amount,
+                "amount_usd": amount_usd,
+                "status": status,
+                "created_at": created_at.isoformat(),
+                "type": "sent" if from_address.lower() == lower_address else "received",
+            }
+            for tx_id, from_address, to_address, amount, amount_usd, status, created_at in rows
+        ]
+
+        return jsonify(
+            {
+                "success": True,
+                "transactions": transaction_list,
+                "high_water_mark": high_water_mark,
+                "has_more": has_more,
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/api/stats/<address>", methods=["GET"])
+def get_address_stats(address):
+    # Get per-day sent/received volume for an address from the rollup table
+    try:
+        days = request.args.get("days", 30, type=int)
+        since = datetime.utcnow().date() - timedelta(days=max(days, 1) - 1)
+
+        db = read_session_for(address)
+        rows = (
+            db.query(AddressDailyVolume)
+            .filter(
+                AddressDailyVolume.address == address,
+                AddressDailyVolume.day >= since,
+            )
+            .order_by(AddressDailyVolume.day.desc())
+            .all()
+        )
+        db.close()
+
+        daily = [
+            {
+                "day": row.day.isoformat(),
+                "sent_count": row.sent_count,
+                "sent_amount": row.sent_amount,
+                "received_count": row.received_count,
+                "received_amount": row.received_amount,
+            }
+            for row in rows
+        ]
+
+        return jsonify(
+            {
+                "success": True,
+                "address": address,
+                "days": daily,
+                "totals": {
+                    "sent_count": sum(d["sent_count"] for d in daily),
+                    "sent_amount": sum(d["sent_amount"] for d in daily),
+                    "received_count": sum(d["received_count"] for d in daily),
+                    "received_amount": sum(d["received_amount"] for d in daily),
+                },
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# Ledger change feed: events are appended in the same commit as the rows they
+# describe; named consumers read after their stored offsets and long-poll for more
+MAX_EVENT_BATCH = int(os.getenv("MAX_EVENT_BATCH", 1000))
+EVENT_FEED_MAX_WAIT = float(os.getenv("EVENT_FEED_MAX_WAIT", 30))
+EVENT_FEED_POLL_SECONDS = float(os.getenv("EVENT_FEED_POLL_SECONDS", 1))
+CONSUMER_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
 
-        return jsonify({"success": True, "transactions": transaction_list})
+ledger_feed = FeedNotifier(EVENT_FEED_POLL_SECONDS)
+
+
+def load_consumer_offsets(consumer):
+    # Stored per-shard positions for a consumer (zeros for a new consumer)
+    positions = [0] * shards.count
+    db = SessionLocal()
+    try:
+        for shard, position in db.query(ConsumerOffset.shard, ConsumerOffset.position).filter(
+            ConsumerOffset.consumer == consumer
+        ):
+            if shard < shards.count:
+                positions[shard] = position
+    finally:
+        db.close()
+    return positions
+
+
+def read_events(positions, limit):
+    # Up to `limit` events per shard after positions; returns (events, positions, has_more)
+    events = []
+    next_positions = list(positions)
+    has_more = False
+    for index in range(shards.count):
+        if request.headers.get("X-Read-Consistency") == "primary":
+            read_engine = shards.engines[index]
+        else:
+            read_engine = shards.read_engine_at(index)
+        with read_engine.connect() as conn:
+            rows = conn.execute(
+                EVENTS_QUERY, {"after": positions[index], "limit": limit + 1}
+            ).all()
+
+        if len(rows) > limit:
+            has_more = True
+            rows = rows[:limit]
+        if rows:
+            next_positions[index] = rows[-1][0]
+        events.extend(
+            {
+                "id": shards.encode_id(event_id, index),
+                "type": event_type,
+                "address": address,
+                "data": json.loads(payload),
+                "created_at": created_at.isoformat(),
+            }
+            for event_id, event_type, address, payload, created_at in rows
+        )
+    return events, next_positions, has_more
+
+
+@app.route("/api/events/<consumer>", methods=["GET"])
+def get_events(consumer):
+    # Read the next batch of ledger events for a named consumer. Events come
+    # after the consumer's stored offsets (or an explicit cursor) in id order
+    # within each shard; nothing is committed until the cursor is posted back.
+    try:
+        if not CONSUMER_NAME.match(consumer):
+            return jsonify({"success": False, "error": "Invalid consumer name"}), 400
+
+        limit = min(max(request.args.get("limit", MAX_EVENT_BATCH, type=int), 1), MAX_EVENT_BATCH)
+        wait = min(max(request.args.get("wait", 0, type=float), 0), EVENT_FEED_MAX_WAIT)
+
+        cursor = request.args.get("cursor")
+        if cursor:
+            try:
+                positions = parse_cursor(cursor, shards.count)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+        else:
+            positions = load_consumer_offsets(consumer)
+
+        # Long-poll: block until events arrive or the wait runs out
+        events, next_positions, has_more = poll(
+            lambda: read_events(positions, limit), ledger_feed, wait
+        )
+
+        return jsonify(
+            {
+                "success": True,
+                "consumer": consumer,
+                "events": events,
+                "cursor": format_cursor(next_positions),
+                "has_more": has_more,
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/api/events/<consumer>/offsets", methods=["POST"])
+def commit_event_offsets(consumer):
+    # Store a consumer's cursor once it has processed the events before it
+    try:
+        if not CONSUMER_NAME.match(consumer):
+            return jsonify({"success": False, "error": "Invalid consumer name"}), 400
+
+        data = request.get_json()
+        try:
+            positions = parse_cursor(str(data.get("cursor", "")), shards.count)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        db = SessionLocal()
+        try:
+            table = ConsumerOffset.__table__
+            stmt = upsert_insert(db, table).values(
+                [
+                    {
+                        "consumer": consumer,
+                        "shard": index,
+                        "position": position,
+                        "updated_at": datetime.utcnow(),
+                    }
+                    for index, position in enumerate(positions)
+                ]
+            )
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[table.c.consumer, table.c.shard],
+                    set_={
+                        "position": stmt.excluded.position,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        return jsonify(
+            {"success": True, "consumer": consumer, "cursor": format_cursor(positions)}
+        )
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# Airdrops: admin bulk credits applied as set-based statements, one commit per chunk
+AIRDROP_ADMIN_TOKEN = os.getenv("AIRDROP_ADMIN_TOKEN")
+AIRDROP_CHUNK_SIZE = int(os.getenv("AIRDROP_CHUNK_SIZE", 50000))
+AIRDROP_SENDER = "airdrop"
+AIRDROP_TOTALS = ("credited", "wallets_created", "amount", "chunks", "skipped_chunks")
+
+
+def parse_airdrop_rows(rows):
+    # [(checksum address, amount)] from (address, amount) string pairs; an
+    # optional header row is skipped. Raises ValueError naming the first bad row.
+    credits = []
+    for number, row in enumerate(rows, start=1):
+        if not row or not "".join(row).strip():
+            continue
+        if number == 1 and row[0].strip().lower() == "address":
+            continue
+        if len(row) != 2:
+            raise ValueError(f"Row {number}: expected address,amount")
+        address, amount = row[0].strip(), row[1].strip()
+        if not ADDRESS_PATTERN.fullmatch(address):
+            raise ValueError(f"Row {number}: invalid address {address!r}")
+        # Wallets are stored in checksum form; any other casing would create a second wallet
+        address = to_checksum_address(address)
+        try:
+            amount = round(float(amount), 6)
+        except ValueError:
+            raise ValueError(f"Row {number}: invalid amount {amount!r}")
+        if not 0 < amount < float("inf"):
+            raise ValueError(f"Row {number}: amount must be positive")
+        credits.append((address, amount))
+    return credits
+
+
+def read_airdrop_csv(lines):
+    # Parse "address,amount" CSV lines (file or request body)
+    return parse_airdrop_rows(csv.reader(lines))
+
+
+# Per-connection staging table holding the chunk being applied
+airdrop_staging = Table(
+    "airdrop_staging",
+    MetaData(),
+    Column("address", String, primary_key=True),
+    Column("amount", Float),
+    # The amount as record_event() writes it into JSON payloads
+    Column("amount_json", String),
+    Column("new_wallet", Integer),
+    prefixes=["TEMPORARY"],
+)
+
+
+def apply_airdrop_chunk(db, airdrop_id, shard_index, chunk_number, credits):
+    # Credit one chunk of a shard's airdrop inside the caller's transaction. The
+    # chunk is staged in a temporary table, then every table is written with one
+    # INSERT ... SELECT. Returns None if this chunk was already applied.
+    chunk_key = f"airdrop:{airdrop_id}:{shard_index}:{chunk_number}"
+    if not claim_fingerprint(db, hashlib.sha256(chunk_key.encode()).hexdigest()):
+        return None
+
+    # One row per address: ON CONFLICT may not touch a row twice in one statement
+    amounts = {}
+    for address, amount in credits:
+        amounts[address] = round(amounts.get(address, 0.0) + amount, 6)
+
+    conn = db.connection()
+    staging = airdrop_staging
+    staging.create(conn, checkfirst=True)
+    conn.execute(delete(staging))
+    conn.execute(
+        insert(staging),
+        [
+            {
+                "address": address,
+                "amount": amount,
+                "amount_json": json.dumps(amount),
+                "new_wallet": 0,
+            }
+            for address, amount in sorted(amounts.items())
+        ],
+    )
+
+    wallets = Wallet.__table__
+    known = select(wallets.c.id).where(wallets.c.address == staging.c.address).exists()
+    conn.execute(update(staging).where(~known).values(new_wallet=1))
+    new_addresses = (
+        conn.execute(select(staging.c.address).where(staging.c.new_wallet == 1)).scalars().all()
+    )
+
+    created_at = literal(datetime.utcnow(), DateTime)
+    # The WHERE keeps SQLite from reading ON CONFLICT as part of the SELECT
+    stmt = upsert_insert(db, wallets).from_select(
+        ["address", "balance", "created_at"],
+        select(staging.c.address, staging.c.amount, created_at).where(staging.c.amount > 0),
+    )
+    conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[wallets.c.address],
+            set_={"balance": wallets.c.balance + stmt.excluded.balance},
+        )
+    )
+
+    transactions = Transaction.__table__
+    last_id = conn.execute(select(func.coalesce(func.max(transactions.c.id), 0))).scalar()
+    conn.execute(
+        insert(transactions).from_select(
+            ["from_address", "to_address", "amount", "status", "signature", "created_at"],
+            select(
+                literal(AIRDROP_SENDER),
+                staging.c.address,
+                staging.c.amount,
+                literal("completed"),
+                literal(chunk_key),
+                created_at,
+            ),
+        )
+    )
+
+    volumes = AddressDailyVolume.__table__
+    stmt = upsert_insert(db, volumes).from_select(
+        [
+            "address",
+            "day",
+            "sent_count",
+            "sent_amount",
+            "received_count",
+            "received_amount",
+        ],
+        select(
+            staging.c.address,
+            literal(created_at.value.date(), Date),
+            literal(0),
+            literal(0.0),
+            literal(1),
+            staging.c.amount,
+        ).where(staging.c.amount > 0),
+    )
+    conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[volumes.c.address, volumes.c.day],
+            set_={
+                "received_count": volumes.c.received_count + stmt.excluded.received_count,
+                "received_amount": volumes.c.received_amount + stmt.excluded.received_amount,
+            },
+        )
+    )
+
+    # Same payloads as record_event() writes for wallet creation and transfers
+    if address_filter is not None:
+        address_filter.add(*new_addresses)
+    events = LedgerEvent.__table__
+    conn.execute(
+        insert(events).from_select(
+            ["event_type", "address", "payload", "created_at"],
+            select(
+                literal("wallet.created"),
+                staging.c.address,
+                literal('{"balance":0.0}'),
+                created_at,
+            ).where(staging.c.new_wallet == 1),
+        )
+    )
+    payload = (
+        literal('{"transaction_id":')
+        + cast(transactions.c.id * shards.count + shard_index, String)
+        + literal(f',"from_address":"{AIRDROP_SENDER}","to_address":"')
+        + transactions.c.to_address
+        + literal('","amount":')
+        + staging.c.amount_json
+        + literal(',"amount_usd":null}')
+    )
+    conn.execute(
+        insert(events).from_select(
+            ["event_type", "address", "payload", "created_at"],
+            select(
+                literal("transfer.completed"),
+                literal(AIRDROP_SENDER),
+                payload,
+                created_at,
+            )
+            .join_from(transactions, staging, staging.c.address == transactions.c.to_address)
+            .where(transactions.c.id > last_id, transactions.c.signature == chunk_key),
+        )
+    )
+
+    return {
+        "credited": len(amounts),
+        "wallets_created": len(new_addresses),
+        "amount": sum(amounts.values()),
+    }
+
+
+def airdrop_input_fingerprints(airdrop_id, shard_index, credits, chunk_size):
+    # (airdrop_id used on this shard, airdrop_id used with exactly this input)
+    digest = hashlib.sha256(f"{chunk_size}".encode())
+    for address, amount in credits:
+        digest.update(f"\n{address},{amount:.6f}".encode())
+    marker = f"airdrop:{airdrop_id}:{shard_index}"
+    return (
+        hashlib.sha256(marker.encode()).hexdigest(),
+        hashlib.sha256(f"{marker}:{digest.hexdigest()}".encode()).hexdigest(),
+    )
+
+
+def airdrop_input_matches(db, fingerprints):
+    # False if this airdrop_id already ran on the shard with a different input
+    marker, expected = fingerprints
+    seen = set(
+        db.execute(
+            select(UsedSignature.fingerprint).where(UsedSignature.fingerprint.in_(fingerprints))
+        ).scalars()
+    )
+    return marker not in seen or expected in seen
+
+
+def run_airdrop(airdrop_id, credits, chunk_size=AIRDROP_CHUNK_SIZE, progress=None):
+    # Apply [(address, amount)] across all shards in parallel, committing each
+    # chunk. Chunks are numbered per shard in input order, so re-running the same
+    # airdrop_id with the same input and chunk size skips committed chunks. A
+    # hash of each shard's input is stored on the first run; re-running the
+    # airdrop_id with anything else raises ValueError before any credit.
+    by_shard = {}
+    for address, amount in credits:
+        by_shard.setdefault(shards.index_for(address), []).append((address, amount))
+    fingerprints = [
+        airdrop_input_fingerprints(airdrop_id, index, by_shard.get(index, []), chunk_size)
+        for index in range(shards.count)
+    ]
+
+    if not all(shards.fan_out(lambda index, db: airdrop_input_matches(db, fingerprints[index]))):
+        raise ValueError(
+            f"Airdrop {airdrop_id} was already run with different credits or chunk size"
+        )
+
+    def apply_shard(index, db):
+        totals = dict.fromkeys(AIRDROP_TOTALS, 0)
+        shard_credits = by_shard.get(index, [])
+        marker, expected = fingerprints[index]
+        first_run = claim_fingerprint(db, marker)
+        if claim_fingerprint(db, expected) != first_run:
+            # Another run with different input claimed this airdrop_id meanwhile
+            db.rollback()
+            raise ValueError(f"Airdrop {airdrop_id} is being run with different credits")
+        db.commit()
+        for chunk_number, start in enumerate(range(0, len(shard_credits), chunk_size)):
+            chunk = shard_credits[start : start + chunk_size]
+            result = apply_airdrop_chunk(db, airdrop_id, index, chunk_number, chunk)
+            db.commit()
+            if result is None:
+                totals["skipped_chunks"] += 1
+                continue
+            recent_writes.mark(*(address for address, _ in chunk))
+            totals["chunks"] += 1
+            for key in ("credited", "wallets_created", "amount"):
+                totals[key] += result[key]
+            if progress is not None:
+                progress(index, totals)
+        return totals
+
+    summary = dict.fromkeys(AIRDROP_TOTALS, 0)
+    for totals in shards.fan_out(apply_shard):
+        for key in summary:
+            summary[key] += totals[key]
+    summary["amount"] = round(summary["amount"], 6)
+    if summary["chunks"]:
+        ledger_feed.notify()
+    return summary
+
+
+@app.route("/api/admin/airdrop", methods=["POST"])
+def airdrop():
+    # Bulk-credit addresses: JSON {airdrop_id, credits: [{address, amount}]} or a
+    # text/csv body of address,amount lines with ?airdrop_id=
+    try:
+        if not AIRDROP_ADMIN_TOKEN:
+            return jsonify({"success": False, "error": "Airdrops are disabled"}), 404
+        if not secrets.compare_digest(
+            request.headers.get("X-Admin-Token", ""), AIRDROP_ADMIN_TOKEN
+        ):
+            return jsonify({"success": False, "error": "Invalid admin token"}), 403
+
+        try:
+            if request.is_json:
+                data = request.get_json()
+                airdrop_id = str(data.get("airdrop_id") or "")
+                credits = parse_airdrop_rows(
+                    [str(credit.get("address", "")), str(credit.get("amount", ""))]
+                    for credit in data.get("credits") or []
+                )
+            else:
+                airdrop_id = request.args.get("airdrop_id", "")
+                credits = read_airdrop_csv(request.get_data(as_text=True).splitlines())
+        except (AttributeError, ValueError) as e:
+            return jsonify({"success": False, "error": f"Invalid credits: {e}"}), 400
+
+        if not CONSUMER_NAME.match(airdrop_id):
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": "airdrop_id must be 1-64 letters, digits, '.', '-' or '_'",
+                    }
+                ),
+                400,
+            )
+        if not credits:
+            return jsonify({"success": False, "error": "No credits given"}), 400
+
+        started = time.perf_counter()
+        try:
+            summary = run_airdrop(airdrop_id, credits)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 409
+        summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return jsonify(dict(summary, success=True, airdrop_id=airdrop_id))
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# Maximum number of sub-requests in one /api/batch call
+MAX_BATCH_REQUESTS = int(os.getenv("MAX_BATCH_REQUESTS", 20))
+
+
+# A whole string of the form "${<id>.<field>}" refers to an earlier response
+BATCH_REFERENCE = re.compile(r"^\$\{([^.{}]+)\.([^{}]+)\}$")
+
+
+def resolve_batch_references(value, results):
+    # Replace "${<id>.<field>}" strings with fields from the responses in
+    # results; raises ValueError for a reference that cannot be resolved
+    if isinstance(value, dict):
+        return {k: resolve_batch_references(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_batch_references(v, results) for v in value]
+    match = BATCH_REFERENCE.match(value) if isinstance(value, str) else None
+    if match:
+        ref_id, field = match.groups()
+        if ref_id not in results:
+            raise ValueError(f"Reference {value} must name one of depends_on")
+        resolved = results[ref_id]["body"]
+        for key in field.split("."):
+            if isinstance(resolved, dict) and key in resolved:
+                resolved = resolved[key]
+            elif isinstance(resolved, list) and key.isdigit() and int(key) < len(resolved):
+                resolved = resolved[int(key)]
+            else:
+                raise ValueError(f"Reference {value} does not match the response of {ref_id}")
+        return resolved
+    return value
+
+
+def run_batch_subrequest(sub_request, results, headers):
+    # Dispatch one sub-request through the normal Flask routing stack; only the
+    # responses it depends on can be referenced
+    dependencies = {d: results[d] for d in sub_request["depends_on"]}
+    try:
+        path = resolve_batch_references(sub_request["path"], dependencies)
+        body = resolve_batch_references(sub_request.get("body"), dependencies)
+    except ValueError as e:
+        return {
+            "id": sub_request["id"],
+            "status": 400,
+            "body": {"success": False, "error": str(e)},
+        }
+    with app.test_request_context(
+        path,
+        method=sub_request.get("method", "GET").upper(),
+        json=body,
+        headers=headers,
+    ):
+        response = app.make_response(app.full_dispatch_request())
+    return {
+        "id": sub_request["id"],
+        "status": response.status_code,
+        "body": response.get_json(silent=True),
+    }
+
+
+@app.route("/api/batch", methods=["POST"])
+def batch():
+    # Run several API calls in one round trip. Sub-requests without
+    # depends_on run concurrently; the rest run once their dependencies
+    # succeed and may reference their results as "${<id>.<field>}".
+    try:
+        data = request.get_json()
+        sub_requests = data.get("requests", [])
+
+        if not sub_requests or len(sub_requests) > MAX_BATCH_REQUESTS:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"Batch must contain between 1 and {MAX_BATCH_REQUESTS} requests",
+                    }
+                ),
+                400,
+            )
+
+        # Ids and dependencies are compared as strings from here on
+        by_id = {}
+        for position, sub_request in enumerate(sub_requests):
+            if not isinstance(sub_request, dict) or not isinstance(
+                sub_request.get("depends_on", []), list
+            ):
+                return (
+                    jsonify({"success": False, "error": "Invalid batch request"}),
+                    400,
+                )
+            sub_request["id"] = str(sub_request.get("id", position))
+            sub_request["depends_on"] = [str(d) for d in sub_request.get("depends_on", [])]
+            path = sub_request.get("path", "")
+            if (
+                not isinstance(path, str)
+                or not path.startswith("/api/")
+                or path.startswith("/api/batch")
+            ):
+                return (
+                    jsonify({"success": False, "error": f"Invalid batch path: {path}"}),
+                    400,
+                )
+            by_id[sub_request["id"]] = sub_request
+
+        for sub_request in sub_requests:
+            for dependency in sub_request["depends_on"]:
+                if dependency not in by_id:
+                    return (
+                        jsonify(
+                            {
+                                "success": False,
+                                "error": f"Unknown dependency: {dependency}",
+                            }
+                        ),
+                        400,
+                    )
+
+        # Forward the caller's headers that influence routing/profiling
+        headers = {
+            key: value
+            for key, value in request.headers.items()
+            if key in ("X-Read-Consistency", "X-Profile")
+        }
+
+        results = {}
+        remaining = dict(by_id)
+        with ThreadPoolExecutor(max_workers=min(len(by_id), 8)) as executor:
+            while remaining:
+                ready = [
+                    sub_request
+                    for sub_request in remaining.values()
+                    if all(d in results for d in sub_request["depends_on"])
+                ]
+                if not ready:
+                    return (
+                        jsonify({"success": False, "error": "Circular dependencies"}),
+                        400,
+                    )
+
+                runnable = []
+                for sub_request in ready:
+                    del remaining[sub_request["id"]]
+                    failed = [d for d in sub_request["depends_on"] if results[d]["status"] >= 400]
+                    if failed:
+                        results[sub_request["id"]] = {
+                            "id": sub_request["id"],
+                            "status": 424,
+                            "body": {
+                                "success": False,
+                                "error": f"Dependency failed: {', '.join(failed)}",
+                            },
+                        }
+                    else:
+                        runnable.append(sub_request)
+
+                for result in executor.map(
+                    lambda sub_request: run_batch_subrequest(sub_request, results, headers),
+                    runnable,
+                ):
+                    results[result["id"]] = result
+
+        return jsonify(
+            {
+                "success": all(r["status"] < 400 for r in results.values()),
+                "responses": [results[r["id"]] for r in sub_requests],
+            }
+        )
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -759,8 +3061,28 @@ def get_transactions(address):
 
 @app.route("/api/health", methods=["GET"])
 def health_check():
-    # Health check endpoint
-    return jsonify({"status": "healthy", "timestamp": datetime.utcnow().isoformat()})
+    # Health check endpoint (pings each shard's read engine, never the write pool)
+    database = "ok"
+    try:
+        for index in range(shards.count):
+            db = shards.read_session_at(index)
+            try:
+                db.execute(select(1))
+            finally:
+                db.close()
+    except Exception:
+        database = "unavailable"
+
+    health = {
+        "status": "healthy",
+        "database": database,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    if address_filter is not None:
+        health["address_filter"] = address_filter.stats()
+    if admission is not None:
+        health["admission"] = admission.stats()
+    return jsonify(health)
 
 
 if __name__ == "__main__":
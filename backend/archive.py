@@ -0,0 +1,182 @@
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+from address_filter import BloomFilter
+
+# Cold storage for old transactions: gzip-compressed NDJSON partitioned by
+# shard and month, plus a small index.json per shard recording each
+# partition's time range and row count and the archive boundary. Every
+# archiving batch becomes its own segment file with a Bloom filter of the
+# addresses it contains, so a history read only decompresses the segments
+# that may hold the address.
+
+_index_lock = threading.Lock()
+
+# Parsed index.json per path, with the (inode, mtime, size) it was read at
+_index_cache = {}
+
+# False-positive rate of each segment's address filter
+SEGMENT_FP_RATE = 0.01
+
+
+def shard_directory(directory, shard_index):
+    return os.path.join(directory, f"shard-{shard_index}")
+
+
+def load_index(directory, shard_index):
+    # Read a shard's archive index ({} when nothing has been archived)
+    path = os.path.join(shard_directory(directory, shard_index), "index.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def cached_index(directory, shard_index):
+    # Read-only view of a shard's index, re-read only when index.json changes
+    # (save_index replaces the file, so its inode and mtime change)
+    path = os.path.join(shard_directory(directory, shard_index), "index.json")
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    cached = _index_cache.get(path)
+    if cached is None or cached[0] != version:
+        cached = (version, load_index(directory, shard_index))
+        _index_cache[path] = cached
+    return cached[1]
+
+
+def save_index(directory, shard_index, index):
+    # Atomically replace a shard's archive index
+    path = os.path.join(shard_directory(directory, shard_index), "index.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_partitions(directory, shard_index, rows, cutoff):
+    # Write rows (dicts with a datetime created_at) as a new segment of their
+    # monthly partitions, each with a Bloom filter of its addresses
+    shard_dir = shard_directory(directory, shard_index)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    by_month = {}
+    for row in rows:
+        by_month.setdefault(row["created_at"].strftime("%Y-%m"), []).append(row)
+
+    with _index_lock:
+        index = load_index(directory, shard_index)
+        partitions = index.setdefault("partitions", {})
+
+        for month, month_rows in sorted(by_month.items()):
+            first = min(r["created_at"] for r in month_rows).isoformat()
+            last = max(r["created_at"] for r in month_rows).isoformat()
+            entry = partitions.setdefault(
+                month, {"rows": 0, "min_created_at": first, "max_created_at": last}
+            )
+            segments = entry.setdefault("segments", [])
+            name = f"transactions-{month}-{len(segments) + 1:05d}"
+
+            with gzip.open(
+                os.path.join(shard_dir, f"{name}.ndjson.gz"), "wt", encoding="utf-8"
+            ) as f:
+                for row in month_rows:
+                    record = dict(row, created_at=row["created_at"].isoformat())
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+            addresses = {r["from_address"].lower() for r in month_rows}
+            addresses.update(r["to_address"].lower() for r in month_rows)
+            bloom = BloomFilter(len(addresses), SEGMENT_FP_RATE)
+            for address in addresses:
+                bloom.add(address)
+            with open(os.path.join(shard_dir, f"{name}.bloom"), "wb") as f:
+                f.write(bloom.to_bytes())
+
+            segments.append(
+                {
+                    "file": f"{name}.ndjson.gz",
+                    "bloom": f"{name}.bloom",
+                    "addresses": len(addresses),
+                    "rows": len(month_rows),
+                    "min_created_at": first,
+                    "max_created_at": last,
+                }
+            )
+            entry["rows"] += len(month_rows)
+            entry["min_created_at"] = min(entry["min_created_at"], first)
+            entry["max_created_at"] = max(entry["max_created_at"], last)
+
+        previous = index.get("archived_before")
+        boundary = cutoff.isoformat()
+        index["archived_before"] = max(previous, boundary) if previous else boundary
+        save_index(directory, shard_index, index)
+
+
+def archived_before(directory, shard_index):
+    # Rows created before this datetime may live in the archive (None if empty)
+    boundary = cached_index(directory, shard_index).get("archived_before")
+    return datetime.fromisoformat(boundary) if boundary else None
+
+
+@lru_cache(maxsize=4096)
+def load_segment_filter(path, capacity):
+    # Segment files never change once written, so their filters are cached
+    with open(path, "rb") as f:
+        return BloomFilter.from_bytes(f.read(), capacity, SEGMENT_FP_RATE)
+
+
+def segment_files(directory, shard_index, address=None, since=None):
+    # Data files, newest partitions first, that may hold rows created at or
+    # after since (and involving address, when given)
+    shard_dir = shard_directory(directory, shard_index)
+    partitions = cached_index(directory, shard_index).get("partitions", {})
+    for month in sorted(partitions, reverse=True):
+        entry = partitions[month]
+        if since and datetime.fromisoformat(entry["max_created_at"]) < since:
+            continue
+        for segment in reversed(entry["segments"]):
+            if since and datetime.fromisoformat(segment["max_created_at"]) < since:
+                continue
+            if address and address not in load_segment_filter(
+                os.path.join(shard_dir, segment["bloom"]), segment["addresses"]
+            ):
+                continue
+            yield os.path.join(shard_dir, segment["file"])
+
+
+def iter_archived_transactions(directory, shard_index, address=None, since=None):
+    # Archived transactions created at or after since (involving address, when given)
+    address = address.lower() if address else None
+    seen = set()
+    for path in segment_files(directory, shard_index, address, since):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if address and (
+                    record["from_address"].lower() != address
+                    and record["to_address"].lower() != address
+                ):
+                    continue
+                record["created_at"] = datetime.fromisoformat(record["created_at"])
+                if since and record["created_at"] < since:
+                    continue
+                # A crash between writing and deleting can archive a row twice
+                if record["id"] in seen:
+                    continue
+                seen.add(record["id"])
+                yield record
+
+
+def read_archived_transactions(directory, shard_index, address, since=None):
+    # Archived transactions involving address, newest partitions first
+    return list(iter_archived_transactions(directory, shard_index, address, since))
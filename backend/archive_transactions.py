@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func
+
+from app import ARCHIVE_DIR, Transaction, shards
+import archive
+
+
+def archive_shard(index, db, cutoff, batch_size):
+    # Move completed transactions older than cutoff from one shard to cold storage
+    archived = 0
+    # The newest row always stays: SQLite tables created before AUTOINCREMENT
+    # was enabled reuse the highest deleted id, which would collide in history
+    newest_id = db.query(func.max(Transaction.id)).scalar()
+    while True:
+        rows = (
+            db.query(Transaction)
+            .filter(
+                Transaction.status == "completed",
+                Transaction.created_at < cutoff,
+                Transaction.id < newest_id,
+            )
+            .order_by(Transaction.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        # Files and index are written (and fsynced) before the rows are deleted;
+        # a crash in between only leaves duplicates, which readers skip
+        archive.write_partitions(
+            ARCHIVE_DIR,
+            index,
+            [
+                {
+                    "id": tx.id,
+                    "from_address": tx.from_address,
+                    "to_address": tx.to_address,
+                    "amount": tx.amount,
+                    "amount_usd": tx.amount_usd,
+                    "status": tx.status,
+                    "signature": tx.signature,
+                    "created_at": tx.created_at,
+                }
+                for tx in rows
+            ],
+            cutoff,
+        )
+        db.query(Transaction).filter(
+            Transaction.id.in_([tx.id for tx in rows])
+        ).delete(synchronize_session=False)
+        db.commit()
+        archived += len(rows)
+        print(f"   shard {index}: {archived} transactions archived")
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Move old completed transactions into compressed cold storage"
+    )
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=365,
+        help="archive transactions older than this many days (default 365)",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+    print("CypherD Wallet Transaction Archiver")
+    print("=" * 50)
+    print(f"Archiving transactions created before {cutoff.isoformat()}")
+    print(f"Archive directory: {os.path.abspath(ARCHIVE_DIR)}")
+
+    try:
+        counts = shards.fan_out(
+            lambda index, db: archive_shard(index, db, cutoff, args.batch_size)
+        )
+    except Exception as e:
+        print(f"Error archiving transactions: {e}")
+        sys.exit(1)
+
+    print()
+    print(f"Archived {sum(counts)} transactions")
+
+
+if __name__ == "__main__":
+    main()
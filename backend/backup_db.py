@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Load environment variables
+load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+
+from sqlalchemy import create_engine, inspect, text
+
+
+def resolve_url(url):
+    # Relative SQLite URLs are resolved against the backend directory
+    if url.startswith("sqlite:///") and not url.startswith("sqlite:////"):
+        return "sqlite:///" + os.path.join(BACKEND_DIR, url[len("sqlite:///") :])
+    return url
+
+
+DATABASE_URL = resolve_url(os.getenv("DATABASE_URL", "sqlite:///wallet.db"))
+SHARD_URLS = [
+    resolve_url(url.strip()) for url in os.getenv("SHARD_URLS", "").split(",") if url.strip()
+]
+
+# Online backups. SQLite databases are copied with the backup API a few pages
+# at a time, sleeping between steps so writers get the lock in between. In WAL
+# mode the copy runs inside one read transaction: its snapshot stays fixed
+# while writers keep committing, so concurrent writes never restart it.
+# PostgreSQL databases are dumped with pg_dump from an exported snapshot, and
+# the output is streamed at a capped rate. Each backup directory holds a
+# manifest.json with per-table row counts and the balance total of every
+# database, taken from the same snapshot as the backup. A restore is checked
+# against those figures. Like view_db.py, this tool opens its own connections
+# and never imports app.py.
+
+
+class BackupRestarted(Exception):
+    pass
+
+
+def databases():
+    # (name, engine) for every database holding wallet data
+    named = [
+        (f"shard-{index}", create_engine(url))
+        for index, url in enumerate(SHARD_URLS or [DATABASE_URL])
+    ]
+    if SHARD_URLS and DATABASE_URL not in SHARD_URLS:
+        named.append(("primary", create_engine(DATABASE_URL)))
+    return named
+
+
+def snapshot_stats(table_names, scalar):
+    # Row count per table and total wallet balance; scalar(sql) runs each query
+    # on the connection holding the snapshot
+    tables = {name: scalar(f'SELECT count(*) FROM "{name}"') for name in sorted(table_names)}
+    balance = scalar("SELECT coalesce(sum(balance), 0.0) FROM wallets")
+    return {"tables": tables, "balance_total": round(balance, 6)}
+
+
+def connection_stats(conn):
+    # snapshot_stats through a SQLAlchemy connection
+    return snapshot_stats(
+        inspect(conn).get_table_names(), lambda sql: conn.execute(text(sql)).scalar()
+    )
+
+
+def sqlite_stats(conn):
+    # snapshot_stats through a sqlite3 connection
+    table_names = [
+        name
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )
+    ]
+    return snapshot_stats(table_names, lambda sql: conn.execute(sql).fetchone()[0])
+
+
+def backup_sqlite(source_path, target_path, pages, sleep_ms, max_restarts):
+    # Copy `pages` pages per step. Outside WAL mode a write by another
+    # connection makes SQLite restart the copy; after max_restarts, finish in
+    # a single step instead. Returns (restarts, stats of the copied snapshot).
+    source = sqlite3.connect(source_path, isolation_level=None)
+    target = sqlite3.connect(target_path)
+    state = {"remaining": None, "restarts": 0}
+
+    # Pin a read snapshot (in rollback-journal mode this would block writers)
+    wal = source.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    if wal:
+        source.execute("BEGIN")
+        source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+
+    def progress(status, remaining, total):
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise BackupRestarted()
+        state["remaining"] = remaining
+        time.sleep(sleep_ms / 1000)
+
+    try:
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        except BackupRestarted:
+            print(f"   source kept changing, finishing {source_path} in one step")
+            source.backup(target, pages=-1)
+
+        if wal:
+            # Same snapshot the copy was read from
+            stats = sqlite_stats(source)
+        else:
+            # Block writers while reading the source; if a write landed after
+            # the copy finished, copy again under the same lock
+            source.execute("BEGIN")
+            stats = sqlite_stats(source)
+            if sqlite_stats(target) != stats:
+                print(f"   {source_path} changed after the copy, copying again in one step")
+                source.backup(target, pages=-1)
+    finally:
+        if source.in_transaction:
+            source.execute("COMMIT")
+        target.close()
+        source.close()
+    return state["restarts"], stats
+
+
+def backup_postgres(url, target_path, max_mb_per_sec):
+    # pg_dump from an exported snapshot; the stats are read in that same snapshot
+    snapshot_engine = create_engine(url, isolation_level="REPEATABLE READ")
+    with snapshot_engine.connect() as conn:
+        snapshot = conn.execute(text("SELECT pg_export_snapshot()")).scalar()
+        stats = connection_stats(conn)
+
+        dump = subprocess.Popen(
+            [
+                "pg_dump",
+                "--format=custom",
+                f"--snapshot={snapshot}",
+                "--dbname",
+                snapshot_engine.url.render_as_string(hide_password=False),
+            ],
+            stdout=subprocess.PIPE,
+        )
+        chunk_size = 1024 * 1024
+        with open(target_path, "wb") as f:
+            started = time.monotonic()
+            written = 0
+            while True:
+                chunk = dump.stdout.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+                if max_mb_per_sec > 0:
+                    # Reading slower makes pg_dump wait on the pipe
+                    elapsed = time.monotonic() - started
+                    ahead = written / (max_mb_per_sec * 1024 * 1024) - elapsed
+                    if ahead > 0:
+                        time.sleep(ahead)
+        if dump.wait() != 0:
+            raise RuntimeError(f"pg_dump exited with status {dump.returncode}")
+    snapshot_engine.dispose()
+    return stats
+
+
+def enable_wal():
+    # Switch every SQLite database to WAL mode (persistent; the server keeps working)
+    for name, db_engine in databases():
+        if db_engine.dialect.name == "sqlite":
+            with sqlite3.connect(db_engine.url.database) as conn:
+                mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            print(f"   {name}: journal_mode={mode}")
+
+
+def run_backup(directory, pages, sleep_ms, max_restarts, max_mb_per_sec):
+    # Back up every database into a new timestamped directory
+    target_dir = os.path.join(directory, datetime.utcnow().strftime("%Y%m%dT%H%M%SZ"))
+    os.makedirs(target_dir)
+    manifest = {"created_at": datetime.utcnow().isoformat(), "databases": []}
+
+    for name, db_engine in databases():
+        started = time.perf_counter()
+        dialect = db_engine.dialect.name
+        if dialect == "sqlite":
+            filename = f"{name}.db"
+            restarts, stats = backup_sqlite(
+                db_engine.url.database,
+                os.path.join(target_dir, filename),
+                pages,
+                sleep_ms,
+                max_restarts,
+            )
+            detail = f"{restarts} restarts"
+        elif dialect == "postgresql":
+            filename = f"{name}.dump"
+            stats = backup_postgres(
+                db_engine.url.render_as_string(hide_password=False),
+                os.path.join(target_dir, filename),
+                max_mb_per_sec,
+            )
+            detail = "pg_dump"
+        else:
+            raise RuntimeError(f"Backups are not supported for {dialect} databases")
+
+        manifest["databases"].append(dict(stats, name=name, file=filename, dialect=dialect))
+        print(
+            f"   {name}: {sum(stats['tables'].values())} rows, balance total "
+            f"{stats['balance_total']} ({time.perf_counter() - started:.1f}s, {detail})"
+        )
+
+    with open(os.path.join(target_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return target_dir
+
+
+def prune_backups(directory, keep):
+    # Keep only the newest `keep` backup directories
+    backups = sorted(
+        entry
+        for entry in os.listdir(directory)
+        if os.path.exists(os.path.join(directory, entry, "manifest.json"))
+    )
+    for entry in backups[:-keep] if keep > 0 else []:
+        shutil.rmtree(os.path.join(directory, entry))
+        print(f"   removed old backup {entry}")
+
+
+def restore_backup(backup_dir, target_urls):
+    # Restore each database of a backup into the matching target URL and check
+    # its row counts and balance total against the manifest
+    with open(os.path.join(backup_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if len(target_urls) != len(manifest["databases"]):
+        raise ValueError(
+            f"Backup holds {len(manifest['databases'])} databases "
+            f"({', '.join(d['name'] for d in manifest['databases'])}); "
+            f"got {len(target_urls)} target URLs"
+        )
+
+    mismatches = []
+    for entry, url in zip(manifest["databases"], target_urls):
+        target_engine = create_engine(url)
+        source_path = os.path.join(backup_dir, entry["file"])
+        if entry["dialect"] == "sqlite":
+            if target_engine.dialect.name != "sqlite":
+                raise ValueError(f"{entry['name']} is a SQLite backup; target must be sqlite:///")
+            source = sqlite3.connect(source_path)
+            target = sqlite3.connect(target_engine.url.database)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+        else:
+            subprocess.run(
+                [
+                    "pg_restore",
+                    "--clean",
+                    "--if-exists",
+                    "--no-owner",
+                    "--dbname",
+                    target_engine.url.render_as_string(hide_password=False),
+                    source_path,
+                ],
+                check=True,
+            )
+
+        with target_engine.connect() as conn:
+            restored = connection_stats(conn)
+        target_engine.dispose()
+
+        for table, count in entry["tables"].items():
+            if restored["tables"].get(table) != count:
+                mismatches.append(
+                    f"{entry['name']}.{table}: {restored['tables'].get(table)} rows, expected {count}"
+                )
+        if abs(restored["balance_total"] - entry["balance_total"]) > 1e-6:
+            mismatches.append(
+                f"{entry['name']}: balance total {restored['balance_total']}, "
+                f"expected {entry['balance_total']}"
+            )
+        print(f"   {entry['name']} restored to {url.split('@')[-1]}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Online database backup and verified restore"
+    )
+    parser.add_argument("--output", default=os.getenv("BACKUP_DIR", "backups"))
+    parser.add_argument(
+        "--pages", type=int, default=100, help="SQLite pages copied per step (default 100)"
+    )
+    parser.add_argument(
+        "--sleep-ms", type=float, default=10, help="pause between SQLite steps (default 10)"
+    )
+    parser.add_argument(
+        "--max-restarts",
+        type=int,
+        default=20,
+        help="SQLite restarts caused by concurrent writes before finishing in one step",
+    )
+    parser.add_argument(
+        "--max-mb-per-sec", type=float, default=0, help="pg_dump throughput cap (0 = none)"
+    )
+    parser.add_argument(
+        "--interval-minutes",
+        type=float,
+        default=0,
+        help="keep running and back up every N minutes",
+    )
+    parser.add_argument("--keep", type=int, default=0, help="backups to keep (0 = all)")
+    parser.add_argument(
+        "--enable-wal",
+        action="store_true",
+        help="switch SQLite databases to WAL mode first (backups then never restart)",
+    )
+    parser.add_argument("--restore", metavar="BACKUP_DIR", help="restore a backup and verify it")
+    parser.add_argument(
+        "--restore-to",
+        help="comma-separated database URLs to restore into, in manifest order",
+    )
+    args = parser.parse_args()
+
+    if args.restore:
+        print("CypherD Wallet Restore")
+        print("=" * 50)
+        if not args.restore_to:
+            print("--restore-to is required with --restore")
+            sys.exit(1)
+        try:
+            mismatches = restore_backup(
+                args.restore, [url.strip() for url in args.restore_to.split(",")]
+            )
+        except Exception as e:
+            print(f"Error restoring backup: {e}")
+            sys.exit(1)
+        print()
+        if mismatches:
+            print("Restore verification failed:")
+            for mismatch in mismatches:
+                print(f"   {mismatch}")
+            sys.exit(1)
+        print("Restore verified: row counts and balance totals match the manifest")
+        return
+
+    print("CypherD Wallet Backup")
+    print("=" * 50)
+    os.makedirs(args.output, exist_ok=True)
+    if args.enable_wal:
+        enable_wal()
+    while True:
+        try:
+            target_dir = run_backup(
+                args.output, args.pages, args.sleep_ms, args.max_restarts, args.max_mb_per_sec
+            )
+            print(f"Backup written to {os.path.abspath(target_dir)}")
+            prune_backups(args.output, args.keep)
+        except Exception as e:
+            print(f"Error backing up database: {e}")
+            if not args.interval_minutes:
+                sys.exit(1)
+
+        if not args.interval_minutes:
+            break
+        time.sleep(args.interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    main()
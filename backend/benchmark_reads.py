@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Use a throwaway database unless one is given explicitly
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "benchmark.db"
+    )
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import BALANCE_QUERY, HISTORY_QUERY, MAX_HISTORY_ROWS, Transaction, Wallet, shards
+from generate_dataset import generate_dataset
+
+
+def orm_balance(address):
+    # Previous get_balance path: full ORM entity through a session
+    db = shards.read_session_at(shards.index_for(address))
+    wallet = db.query(Wallet).filter(Wallet.address == address).first()
+    db.close()
+    return wallet.balance if wallet else None
+
+
+def core_balance(address):
+    # Current get_balance path: cached Core statement, scalar result
+    with shards.read_engine_at(shards.index_for(address)).connect() as conn:
+        return conn.execute(BALANCE_QUERY, {"address": address}).scalar()
+
+
+def orm_history(address):
+    db = shards.read_session_at(shards.index_for(address))
+    transactions = (
+        db.query(Transaction)
+        .filter((Transaction.from_address == address) | (Transaction.to_address == address))
+        .order_by(Transaction.created_at.desc())
+        .all()
+    )
+    db.close()
+    return [(tx.id, tx.amount, tx.created_at) for tx in transactions]
+
+
+def core_history(address):
+    with shards.read_engine_at(shards.index_for(address)).connect() as conn:
+        rows = conn.execute(HISTORY_QUERY, {"address": address, "limit": MAX_HISTORY_ROWS}).all()
+    return [(row[0], row[3], row[6]) for row in rows]
+
+
+def measure(fn, addresses):
+    # (microseconds per call, KiB allocated per call)
+    for address in addresses[:20]:
+        fn(address)
+
+    started = time.perf_counter()
+    for address in addresses:
+        fn(address)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for address in addresses[:200]:
+        fn(address)
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size for stat in snapshot.statistics("filename"))
+    return (
+        elapsed / len(addresses) * 1e6,
+        allocated / min(len(addresses), 200) / 1024,
+        peak / 1024,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM vs. Core hot read paths")
+    parser.add_argument("--wallets", type=int, default=5000)
+    parser.add_argument("--transactions", type=int, default=50000)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("CypherD Wallet Read Path Benchmark")
+    print("=" * 50)
+    hot, cold = generate_dataset(args.wallets, args.transactions, progress=False)
+    rng = random.Random(1)
+    balance_addresses = [rng.choice(hot + cold) for _ in range(args.calls)]
+    history_addresses = [rng.choice(cold) for _ in range(args.calls)]
+
+    for label, orm_fn, core_fn, addresses in (
+        ("get_balance", orm_balance, core_balance, balance_addresses),
+        ("get_transactions", orm_history, core_history, history_addresses),
+    ):
+        print(f"\n{label}")
+        for path, fn in (("orm", orm_fn), ("core", core_fn)):
+            per_call_us, kib_per_call, peak_kib = measure(fn, addresses)
+            print(
+                f"   {path:<5} {per_call_us:>9.1f} us/call"
+                f"   {kib_per_call:>7.2f} KiB retained/call   peak {peak_kib:>8.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+
+from signing import available_backends, get_backend, hash_personal_message
+
+
+def make_samples(count):
+    # Sign transfer-style messages with fresh keys
+    samples = []
+    for i in range(count):
+        account = Account.create()
+        message = (
+            f"Transfer 0.500000 ETH to 0x742d35Cc6634C0532925a3b8D4C9db96c728b0B4 "
+            f"from {account.address} at {1700000000 + i}"
+        )
+        signed = Account.sign_message(encode_defunct(text=message), account.key)
+        samples.append((message, signed.signature.hex(), account.address))
+    return samples
+
+
+def run_backend(name, samples, iterations):
+    # Return verifies per second for one backend
+    backend = get_backend(name)
+
+    # Check correctness once before timing
+    for message, signature, address in samples:
+        if backend.recover(hash_personal_message(message), signature) != address:
+            raise RuntimeError(f"{name} backend recovered the wrong address")
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message, signature, _address in samples:
+            backend.recover(hash_personal_message(message), signature)
+    elapsed = time.perf_counter() - start
+    return (iterations * len(samples)) / elapsed
+
+
+def run_eth_account(samples, iterations):
+    # Baseline: the encode_defunct + Account.recover_message path
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message, signature, _address in samples:
+            Account.recover_message(encode_defunct(text=message), signature=signature)
+    elapsed = time.perf_counter() - start
+    return (iterations * len(samples)) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure signature verifications per second for each backend"
+    )
+    parser.add_argument("--samples", type=int, default=20, help="distinct signatures")
+    parser.add_argument("--iterations", type=int, default=10, help="passes over samples")
+    args = parser.parse_args()
+
+    print("CypherD Wallet Signature Verification Benchmark")
+    print("=" * 50)
+    samples = make_samples(args.samples)
+
+    results = [("eth_account", run_eth_account(samples, args.iterations))]
+    for name in available_backends():
+        results.append((name, run_backend(name, samples, args.iterations)))
+
+    for name, rate in results:
+        print(f"{name:<12} {rate:>10.1f} verifies/sec")
+
+    if "coincurve" not in available_backends():
+        print()
+        print("coincurve is not installed; install it for the native secp256k1 backend")
+
+
+if __name__ == "__main__":
+    main()
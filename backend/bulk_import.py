@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mnemonic import Mnemonic
+
+from hd_wallet import derive_addresses
+
+_mnemo = Mnemonic("english")
+
+
+def derive_import_address(mnemonic_phrase):
+    # Validate a phrase and return its default address (None if invalid)
+    mnemonic_phrase = " ".join(mnemonic_phrase.split())
+    if not mnemonic_phrase or not _mnemo.check(mnemonic_phrase):
+        return None
+    return derive_addresses(mnemonic_phrase, 0, 1)[0][2]
+
+
+def derive_import_batch(phrases):
+    # Worker task: derive_import_address for a batch of phrases
+    return [derive_import_address(phrase) for phrase in phrases]
+
+
+def read_phrases(source):
+    # Yield one phrase per non-empty line
+    for line in source:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def derive_streaming(executor, phrases, window, batch_size=64):
+    # Yield addresses in input order with at most `window` batches in flight,
+    # so the input is only read as fast as results are consumed
+    pending = deque()
+    while True:
+        batch = list(islice(phrases, batch_size))
+        if batch:
+            pending.append(executor.submit(derive_import_batch, batch))
+        if pending and (len(pending) >= window or not batch):
+            yield from pending.popleft().result()
+        elif not batch:
+            return
+
+
+def bulk_import(source, chunk_size=1000, workers=None):
+    # Derive addresses across all cores and upsert them chunk by chunk
+    # (app is imported here so worker processes never build the Flask app)
+    from app import shards, upsert_wallets
+
+    processed = 0
+    imported = 0
+    invalid = 0
+    started = time.perf_counter()
+    chunk = []
+
+    def flush(chunk):
+        # Upsert one chunk; returns how many wallets were actually created
+        created = 0
+        for index, addresses in shards.group_by_shard(chunk).items():
+            db = shards.session_at(index)
+            try:
+                _, new_addresses = upsert_wallets(db, addresses)
+                db.commit()
+            finally:
+                db.close()
+            created += len(new_addresses)
+        return created
+
+    window = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        addresses = derive_streaming(executor, read_phrases(source), window)
+        for address in addresses:
+            processed += 1
+            if address is None:
+                invalid += 1
+            else:
+                chunk.append(address)
+
+            if len(chunk) >= chunk_size:
+                imported += flush(chunk)
+                chunk = []
+                elapsed = time.perf_counter() - started
+                print(
+                    f"   {processed} phrases processed, {imported} imported, "
+                    f"{invalid} invalid ({processed / elapsed:.1f} phrases/sec)"
+                )
+
+        if chunk:
+            imported += flush(chunk)
+
+    elapsed = time.perf_counter() - started
+    return processed, imported, invalid, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import mnemonic phrases (one per line) into the wallet database"
+    )
+    parser.add_argument(
+        "file", nargs="?", help="file with one phrase per line (default: stdin)"
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print("CypherD Wallet Bulk Import")
+    print("=" * 50)
+
+    try:
+        if args.file:
+            with open(args.file, encoding="utf-8") as source:
+                result = bulk_import(source, args.chunk_size, args.workers)
+        else:
+            result = bulk_import(sys.stdin, args.chunk_size, args.workers)
+    except Exception as e:
+        print(f"Error importing wallets: {e}")
+        sys.exit(1)
+
+    processed, imported, invalid, elapsed = result
+    print()
+    print("Import complete")
+    print(f"   Phrases processed: {processed}")
+    print(f"   Wallets imported: {imported}")
+    print(f"   Invalid phrases: {invalid}")
+    print(f"   Elapsed: {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.1f} phrases/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import threading
+import time
+
+# Long-poll support for the ledger change feed. Writers call notify() after
+# committing events; readers block in wait() until something new may be
+# available, re-checking the database at least every poll_interval so events
+# written by other processes are picked up too.
+
+
+class FeedNotifier:
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self._condition = threading.Condition()
+        self._version = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def notify(self):
+        # Wake every waiting reader
+        with self._condition:
+            self._version += 1
+            self._condition.notify_all()
+
+    def wait(self, version, timeout):
+        # Block until notify() is called after `version` was read, or up to
+        # min(timeout, poll_interval) seconds; True if notified
+        with self._condition:
+            if self._version != version:
+                return True
+            self._condition.wait(min(timeout, self.poll_interval))
+            return self._version != version
+
+
+def parse_cursor(cursor, shard_count):
+    # "12,7" -> [12, 7]: last consumed local event id per shard
+    positions = [int(part) for part in cursor.split(",")]
+    if len(positions) != shard_count or any(position < 0 for position in positions):
+        raise ValueError(f"Cursor must list {shard_count} non-negative event ids")
+    return positions
+
+
+def format_cursor(positions):
+    return ",".join(str(position) for position in positions)
+
+
+def poll(fetch, notifier, wait):
+    # Call fetch() until it returns something or `wait` seconds pass
+    deadline = time.monotonic() + wait
+    while True:
+        version = notifier.version
+        result = fetch()
+        remaining = deadline - time.monotonic()
+        if result[0] or remaining <= 0:
+            return result
+        notifier.wait(version, remaining)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import insert
+
+from app import Transaction, Wallet, rebuild_daily_volume, shards
+
+# Rows per bulk INSERT
+CHUNK_SIZE = 10000
+
+
+def synthetic_address(seed, n):
+    # Deterministic, well-formed (non-checksummed) address
+    return "0x" + hashlib.sha256(f"{seed}:{n}".encode()).hexdigest()[:40]
+
+
+def generate_dataset(
+    wallets,
+    transactions,
+    seed=42,
+    hot_fraction=0.01,
+    hot_share=0.5,
+    days=365,
+    burst_share=0.2,
+    progress=True,
+):
+    # Bulk-load wallets and transactions with skew: a small set of hot
+    # addresses takes hot_share of all traffic and burst_share of transfers
+    # land in a few short bursts. Returns (hot_addresses, cold_addresses).
+    rng = random.Random(seed)
+    addresses = [synthetic_address(seed, n) for n in range(wallets)]
+    hot_count = max(1, int(wallets * hot_fraction))
+    hot = addresses[:hot_count]
+    cold = addresses[hot_count:] or hot
+
+    now = datetime.utcnow()
+    started = time.perf_counter()
+
+    def flush(model, rows_by_shard):
+        for index, rows in rows_by_shard.items():
+            if not rows:
+                continue
+            db = shards.session_at(index)
+            try:
+                db.execute(insert(model), rows)
+                db.commit()
+            finally:
+                db.close()
+            rows.clear()
+
+    # Wallets
+    pending = {}
+    for n, address in enumerate(addresses, start=1):
+        pending.setdefault(shards.index_for(address), []).append(
+            {
+                "address": address,
+                "balance": round(rng.uniform(1.0, 10.0), 4),
+                "created_at": now - timedelta(days=days),
+            }
+        )
+        if n % CHUNK_SIZE == 0:
+            flush(Wallet, pending)
+    flush(Wallet, pending)
+    if progress:
+        print(f"   {wallets} wallets loaded ({time.perf_counter() - started:.1f}s)")
+
+    # Bursts: a handful of 10 minute windows that attract burst_share of transfers
+    bursts = [now - timedelta(days=rng.uniform(0, days)) for _ in range(5)]
+
+    def pick():
+        return rng.choice(hot) if rng.random() < hot_share else rng.choice(cold)
+
+    pending = {}
+    for n in range(1, transactions + 1):
+        from_address = pick()
+        to_address = pick()
+        while to_address == from_address and wallets > 1:
+            to_address = pick()
+
+        if rng.random() < burst_share:
+            created_at = rng.choice(bursts) + timedelta(seconds=rng.uniform(0, 600))
+        else:
+            created_at = now - timedelta(seconds=rng.uniform(0, days * 86400))
+
+        row = {
+            "from_address": from_address,
+            "to_address": to_address,
+            "amount": round(rng.expovariate(2.0), 6),
+            "amount_usd": None,
+            "status": "completed",
+            "created_at": created_at,
+        }
+        sender_shard = shards.index_for(from_address)
+        pending.setdefault(sender_shard, []).append(row)
+        recipient_shard = shards.index_for(to_address)
+        if recipient_shard != sender_shard:
+            # Mirror row, as written by cross-shard transfers
+            pending.setdefault(recipient_shard, []).append(dict(row))
+
+        if n % CHUNK_SIZE == 0:
+            flush(Transaction, pending)
+            if progress and n % (CHUNK_SIZE * 10) == 0:
+                elapsed = time.perf_counter() - started
+                print(f"   {n} transactions loaded ({n / elapsed:.0f} rows/sec)")
+    flush(Transaction, pending)
+
+    def rebuild(index, db):
+        rows = rebuild_daily_volume(db, index)
+        db.commit()
+        return rows
+
+    shards.fan_out(rebuild)
+    if progress:
+        print(f"   {transactions} transactions loaded ({time.perf_counter() - started:.1f}s)")
+    return hot, cold
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk-load a deterministic synthetic dataset into DATABASE_URL"
+    )
+    parser.add_argument("--wallets", type=int, default=100000)
+    parser.add_argument("--transactions", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--hot-fraction", type=float, default=0.01)
+    parser.add_argument("--hot-share", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print("CypherD Wallet Synthetic Dataset Generator")
+    print("=" * 50)
+    generate_dataset(
+        args.wallets,
+        args.transactions,
+        seed=args.seed,
+        hot_fraction=args.hot_fraction,
+        hot_share=args.hot_share,
+    )
+    print("Dataset generated")
+
+
+if __name__ == "__main__":
+    main()
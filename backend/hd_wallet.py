@@ -0,0 +1,48 @@
+import hashlib
+import hmac
+from eth_account.hdaccount import seed_from_mnemonic
+from eth_keys import keys
+
+# eth_account has no public API for deriving from a cached node. Its
+# undocumented deterministic module is only used by child_key below, and
+# eth-account is pinned in requirements.txt so it cannot change underneath.
+from eth_account.hdaccount import deterministic
+
+# BIP44 account chain for Ethereum; child N gives m/44'/60'/0'/0/N
+ETHEREUM_ACCOUNT_CHAIN = "m/44'/60'/0'/0"
+
+# Indexes from 2**31 up are hardened children, so N must stay below that
+MAX_CHILD_INDEX = 2**31 - 1
+
+
+def child_key(key, chain_code, index, hardened=False):
+    # One BIP32 derivation step; returns (child key, child chain code)
+    if not 0 <= index <= MAX_CHILD_INDEX:
+        raise ValueError(f"Child index must be between 0 and {MAX_CHILD_INDEX}")
+    node = deterministic.HardNode(index) if hardened else deterministic.SoftNode(index)
+    return deterministic.derive_child_key(key, chain_code, node)
+
+
+def derive_parent_node(mnemonic_phrase, passphrase=""):
+    # Stretch the seed and walk to the account chain node once
+    seed = seed_from_mnemonic(mnemonic_phrase, passphrase)
+    master_node = hmac.new(b"Bitcoin seed", seed, hashlib.sha512).digest()
+    key = master_node[:32]
+    chain_code = master_node[32:]
+    for part in ETHEREUM_ACCOUNT_CHAIN.split("/")[1:]:
+        key, chain_code = child_key(key, chain_code, int(part.rstrip("'")), part.endswith("'"))
+    return key, chain_code
+
+
+def derive_addresses(mnemonic_phrase, start=0, count=1, passphrase=""):
+    # Return [(index, path, address)] for child indexes start..start+count-1
+    if start < 0 or start + count - 1 > MAX_CHILD_INDEX:
+        raise ValueError(f"Account indexes must be between 0 and {MAX_CHILD_INDEX}")
+    parent_key, parent_chain_code = derive_parent_node(mnemonic_phrase, passphrase)
+
+    accounts = []
+    for index in range(start, start + count):
+        key, _ = child_key(parent_key, parent_chain_code, index)
+        address = keys.PrivateKey(key).public_key.to_checksum_address()
+        accounts.append((index, f"{ETHEREUM_ACCOUNT_CHAIN}/{index}", address))
+    return accounts
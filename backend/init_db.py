@@ -9,7 +9,7 @@ load_dotenv()
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import Base, engine
+from app import Base, engine, shards, rebuild_daily_volume
 
 
 def init_database():
@@ -17,14 +17,28 @@ def init_database():
     print("Initializing CypherD Wallet Database...")
 
     try:
-        # Create all tables
+        # Create all tables (on every shard when sharding is enabled)
         Base.metadata.create_all(bind=engine)
+        for shard_engine in shards.engines:
+            Base.metadata.create_all(bind=shard_engine)
         print("Database tables created successfully!")
         print("Created tables:")
         print("   - wallets")
         print("   - transactions")
         print("   - pending_transfers")
+        print("   - address_daily_volume")
         print()
+
+        if "--rebuild-stats" in sys.argv:
+
+            def rebuild(index, db):
+                rows = rebuild_daily_volume(db, index)
+                db.commit()
+                return rows
+
+            rows = sum(shards.fan_out(rebuild))
+            print(f"Rebuilt address_daily_volume ({rows} rows)")
+            print()
         print("You can now start the server with: python run.py")
 
     except Exception as e:
@@ -0,0 +1,140 @@
+import math
+import re
+import time
+
+from eth_utils import to_checksum_address
+
+# Signed transfer intents: the client builds this canonical text itself, signs
+# it (EIP-191) and submits intent + signature in one call. The version line
+# lets the format change without old signatures being read under new rules.
+# Scheduled transfers use the same approach with a schedule authorization.
+
+INTENT_VERSION = 1
+NONCE_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+ADDRESS_PATTERN = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+
+def intent_message(from_address, to_address, amount, nonce, expires_at):
+    # Canonical text signed by the sender (amount in ETH, 6 decimals)
+    return "\n".join(
+        [
+            f"CypherD transfer intent v{INTENT_VERSION}",
+            f"From: {from_address}",
+            f"To: {to_address}",
+            f"Amount: {amount:.6f} ETH",
+            f"Nonce: {nonce}",
+            f"Expires: {expires_at}",
+        ]
+    )
+
+
+def schedule_message(
+    from_address, to_address, amount, start_at, interval_seconds, occurrences, nonce
+):
+    # Canonical text authorizing a one-off (interval 0) or recurring transfer
+    return "\n".join(
+        [
+            f"CypherD scheduled transfer v{INTENT_VERSION}",
+            f"From: {from_address}",
+            f"To: {to_address}",
+            f"Amount: {amount:.6f} ETH",
+            f"Start: {start_at}",
+            f"Every: {interval_seconds} seconds",
+            f"Occurrences: {occurrences}",
+            f"Nonce: {nonce}",
+        ]
+    )
+
+
+def cancel_schedule_message(schedule_id):
+    # Text the sender signs to cancel a scheduled transfer
+    return f"Cancel CypherD scheduled transfer {schedule_id}"
+
+
+def number_field(data, field, kind):
+    # data[field] as kind (int or float); anything but a number or numeric string is a ValueError
+    value = data.get(field) or 0
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{field} must be a number")
+    return kind(value)
+
+
+def address_fields(data, label):
+    # (from_address, to_address) exactly as sent, which is how the client signed them
+    addresses = []
+    for field in ("from_address", "to_address"):
+        value = data.get(field)
+        if not isinstance(value, str) or not ADDRESS_PATTERN.fullmatch(value):
+            raise ValueError(f"{label} needs valid from_address and to_address")
+        addresses.append(value)
+    return addresses
+
+
+def parse_intent(data, max_ttl):
+    # Validate a submitted intent; returns (from, to, amount, nonce, expires_at, message)
+    if not isinstance(data, dict):
+        raise ValueError("Intent must be an object")
+    if number_field(data, "version", int) != INTENT_VERSION:
+        raise ValueError(f"Unsupported intent version (expected {INTENT_VERSION})")
+
+    signed_from, signed_to = address_fields(data, "Intent")
+
+    amount = round(number_field(data, "amount", float), 6)
+    if not (math.isfinite(amount) and amount > 0):
+        raise ValueError("Intent amount must be positive")
+
+    nonce = str(data.get("nonce") or "")
+    if not NONCE_PATTERN.match(nonce):
+        raise ValueError("Intent nonce must be 8-64 letters, digits, '-' or '_'")
+
+    expires_at = number_field(data, "expires_at", int)
+    now = int(time.time())
+    if expires_at < now:
+        raise ValueError("Intent expired")
+    if expires_at > now + max_ttl:
+        raise ValueError(f"Intent expiry must be within {max_ttl} seconds")
+
+    message = intent_message(signed_from, signed_to, amount, nonce, expires_at)
+    from_address = to_checksum_address(signed_from)
+    to_address = to_checksum_address(signed_to)
+    return from_address, to_address, amount, nonce, expires_at, message
+
+
+def parse_schedule(data, min_interval, max_start_delay):
+    # Validate a submitted schedule; returns (from, to, amount, start_at,
+    # interval_seconds, occurrences, message). Occurrences 0 means unlimited.
+    if not isinstance(data, dict):
+        raise ValueError("Schedule must be an object")
+    if number_field(data, "version", int) != INTENT_VERSION:
+        raise ValueError(f"Unsupported schedule version (expected {INTENT_VERSION})")
+
+    signed_from, signed_to = address_fields(data, "Schedule")
+
+    amount = round(number_field(data, "amount", float), 6)
+    if not (math.isfinite(amount) and amount > 0):
+        raise ValueError("Schedule amount must be positive")
+
+    nonce = str(data.get("nonce") or "")
+    if not NONCE_PATTERN.match(nonce):
+        raise ValueError("Schedule nonce must be 8-64 letters, digits, '-' or '_'")
+
+    start_at = number_field(data, "start_at", int)
+    now = int(time.time())
+    if start_at < now - 60 or start_at > now + max_start_delay:
+        raise ValueError(f"Schedule must start within the next {max_start_delay} seconds")
+
+    interval_seconds = number_field(data, "interval_seconds", int)
+    occurrences = number_field(data, "occurrences", int)
+    if interval_seconds == 0 and occurrences != 1:
+        raise ValueError("One-off transfers (interval 0) must have occurrences 1")
+    if 0 < interval_seconds < min_interval:
+        raise ValueError(f"Recurring transfers must be at least {min_interval} seconds apart")
+    if occurrences < 0:
+        raise ValueError("Occurrences must be 0 (unlimited) or more")
+
+    message = schedule_message(
+        signed_from, signed_to, amount, start_at, interval_seconds, occurrences, nonce
+    )
+    from_address = to_checksum_address(signed_from)
+    to_address = to_checksum_address(signed_to)
+    return from_address, to_address, amount, start_at, interval_seconds, occurrences, message
@@ -0,0 +1,393 @@
+import threading
+from datetime import datetime
+from string import Template
+
+# Email templates are parsed once at import time; only the per-transfer
+# fields are substituted when a notification is rendered.
+
+_HTML_HEAD = """
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>$title - CypherD Wallet</title>
+        <style>
+            body {
+                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                background-color: #f4f4f4;
+                margin: 0;
+                padding: 0;
+            }
+            .container {
+                max-width: 600px;
+                margin: 0 auto;
+                background-color: #ffffff;
+                border-radius: 10px;
+                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+                overflow: hidden;
+            }
+            .header {
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                color: white;
+                padding: 30px 20px;
+                text-align: center;
+            }
+            .header h1 {
+                margin: 0;
+                font-size: 28px;
+                font-weight: 300;
+            }
+            .header .subtitle {
+                margin: 10px 0 0 0;
+                font-size: 16px;
+                opacity: 0.9;
+            }
+            .content {
+                padding: 40px 30px;
+            }
+            .success-icon {
+                text-align: center;
+                margin-bottom: 30px;
+            }
+            .success-icon .icon {
+                width: 80px;
+                height: 80px;
+                background-color: #4CAF50;
+                border-radius: 50%;
+                display: inline-flex;
+                align-items: center;
+                justify-content: center;
+                font-size: 40px;
+                color: white;
+            }
+            .transaction-details {
+                background-color: #f8f9fa;
+                border-radius: 8px;
+                padding: 25px;
+                margin: 25px 0;
+                border-left: 4px solid #4CAF50;
+            }
+            .detail-row:last-child {
+                border-bottom: none;
+            }
+            .detail-label {
+                font-weight: 600;
+                color: #495057;
+                min-width: 120px;
+            }
+            .detail-value {
+                font-family: 'Courier New', monospace;
+                background-color: #ffffff;
+                padding: 8px 12px;
+                border-radius: 4px;
+                border: 1px solid #dee2e6;
+                word-break: break-all;
+                flex: 1;
+                margin-left: 15px;
+                text-align: left;
+                min-width: 0;
+                line-height: 1.4;
+            }
+            .detail-row {
+                display: flex;
+                align-items: flex-start;
+                padding: 12px 0;
+                border-bottom: 1px solid #e9ecef;
+                min-height: auto;
+            }
+            .amount-highlight {
+                font-size: 24px;
+                font-weight: bold;
+                color: #4CAF50;
+                text-align: center;
+                margin: 20px 0;
+                padding: 20px;
+                background-color: #e8f5e8;
+                border-radius: 8px;
+                border: 2px solid #4CAF50;
+            }
+            .footer {
+                background-color: #f8f9fa;
+                padding: 30px;
+                text-align: center;
+                border-top: 1px solid #e9ecef;
+            }
+            .footer p {
+                margin: 5px 0;
+                color: #6c757d;
+                font-size: 14px;
+            }
+            .footer .logo {
+                font-weight: bold;
+                color: #667eea;
+                font-size: 18px;
+            }
+            .timestamp {
+                color: #6c757d;
+                font-size: 12px;
+                text-align: center;
+                margin-top: 20px;
+            }
+        </style>
+    </head>
+"""
+
+_HTML_FOOTER = """
+            <div class="footer">
+                <p class="logo">CypherD Wallet</p>
+                <p>Secure • Fast • Reliable</p>
+                <p>Thank you for using CypherD Wallet for your cryptocurrency transactions.</p>
+                <div class="timestamp">
+                    $completed_label $timestamp
+                </div>
+            </div>
+        </div>
+    </body>
+    </html>
+"""
+
+TRANSFER_HTML = Template(
+    _HTML_HEAD
+    + """
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🎉 Transfer Successful!</h1>
+                <p class="subtitle">Your transaction has been completed successfully</p>
+            </div>
+            
+            <div class="content">
+                
+                <div class="amount-highlight">
+                    $amount ETH
+                </div>
+                
+                <div class="transaction-details">
+                    <div class="detail-row">
+                        <span class="detail-label">From:</span>
+                        <span class="detail-value">$from_address</span>
+                    </div>
+                    <div class="detail-row">
+                        <span class="detail-label">To:</span>
+                        <span class="detail-value">$to_address</span>
+                    </div>
+                    <div class="detail-row">
+                        <span class="detail-label">Amount:</span>
+                        <span class="detail-value">$amount ETH</span>
+                    </div>
+                    <div class="detail-row">
+                        <span class="detail-label">Status:</span>
+                        <span class="detail-value" style="color: #4CAF50; font-weight: bold;">✅ Completed</span>
+                    </div>
+                </div>
+                
+                <p style="text-align: center; color: #6c757d; margin-top: 30px;">
+                    Your transaction has been successfully processed and recorded on the blockchain.
+                    You can view the full transaction history in your CypherD Wallet dashboard.
+                </p>
+            </div>
+            
+"""
+    + _HTML_FOOTER
+)
+
+TRANSFER_TEXT = Template(
+    """
+    TRANSFER SUCCESSFUL - CypherD Wallet
+    
+    Your transaction has been completed successfully!
+    
+    Transaction Details:
+    ===================
+    From: $from_address
+    To: $to_address
+    Amount: $amount ETH
+    Status: ✅ Completed
+    
+    Your transaction has been successfully processed and recorded on the blockchain.
+    You can view the full transaction history in your CypherD Wallet dashboard.
+    
+    Transaction completed on $timestamp
+    
+    ---
+    CypherD Wallet
+    Secure • Fast • Reliable
+    Thank you for using CypherD Wallet for your cryptocurrency transactions.
+    """
+)
+
+DIGEST_HTML = Template(
+    _HTML_HEAD
+    + """
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🎉 $count Transfers Successful!</h1>
+                <p class="subtitle">Your recent transactions have been completed successfully</p>
+            </div>
+            
+            <div class="content">
+                
+                <div class="amount-highlight">
+                    $total ETH
+                </div>
+                $rows
+                <p style="text-align: center; color: #6c757d; margin-top: 30px;">
+                    Your transactions have been successfully processed and recorded on the blockchain.
+                    You can view the full transaction history in your CypherD Wallet dashboard.
+                </p>
+            </div>
+            
+"""
+    + _HTML_FOOTER
+)
+
+DIGEST_ROW_HTML = Template(
+    """
+                <div class="transaction-details">
+                    <div class="detail-row">
+                        <span class="detail-label">From:</span>
+                        <span class="detail-value">$from_address</span>
+                    </div>
+                    <div class="detail-row">
+                        <span class="detail-label">To:</span>
+                        <span class="detail-value">$to_address</span>
+                    </div>
+                    <div class="detail-row">
+                        <span class="detail-label">Amount:</span>
+                        <span class="detail-value">$amount ETH</span>
+                    </div>
+                    <div class="detail-row">
+                        <span class="detail-label">Time:</span>
+                        <span class="detail-value">$timestamp</span>
+                    </div>
+                </div>
+"""
+)
+
+DIGEST_TEXT = Template(
+    """
+    $count TRANSFERS SUCCESSFUL - CypherD Wallet
+    
+    Your recent transactions have been completed successfully!
+    
+    Total: $total ETH
+    
+    Transaction Details:
+    ===================
+$rows
+    Your transactions have been successfully processed and recorded on the blockchain.
+    You can view the full transaction history in your CypherD Wallet dashboard.
+    
+    Digest sent on $timestamp
+    
+    ---
+    CypherD Wallet
+    Secure • Fast • Reliable
+    Thank you for using CypherD Wallet for your cryptocurrency transactions.
+    """
+)
+
+DIGEST_ROW_TEXT = Template(
+    """    From: $from_address
+    To: $to_address
+    Amount: $amount ETH
+    Time: $timestamp
+    -------------------
+"""
+)
+
+
+def format_timestamp(moment=None):
+    # Human readable timestamp used in every notification
+    return (moment or datetime.now()).strftime("%B %d, %Y at %I:%M %p UTC")
+
+
+def render_transfer(transfer):
+    # Render (text, html) bodies for a single transfer
+    fields = {
+        "title": "Transfer Successful",
+        "amount": f"{transfer['amount']:.6f}",
+        "from_address": transfer["from_address"],
+        "to_address": transfer["to_address"],
+        "timestamp": transfer["timestamp"],
+        "completed_label": "Transaction completed on",
+    }
+    return TRANSFER_TEXT.substitute(fields), TRANSFER_HTML.substitute(fields)
+
+
+def render_digest(transfers):
+    # Render (text, html) bodies summarising several transfers in one email
+    html_rows = []
+    text_rows = []
+    for transfer in transfers:
+        row = {
+            "amount": f"{transfer['amount']:.6f}",
+            "from_address": transfer["from_address"],
+            "to_address": transfer["to_address"],
+            "timestamp": transfer["timestamp"],
+        }
+        html_rows.append(DIGEST_ROW_HTML.substitute(row))
+        text_rows.append(DIGEST_ROW_TEXT.substitute(row))
+
+    fields = {
+        "title": f"{len(transfers)} Transfers Successful",
+        "count": len(transfers),
+        "total": f"{sum(t['amount'] for t in transfers):.6f}",
+        "timestamp": format_timestamp(),
+        "completed_label": "Digest sent on",
+    }
+    html_body = DIGEST_HTML.substitute(fields, rows="".join(html_rows))
+    text_body = DIGEST_TEXT.substitute(fields, rows="".join(text_rows))
+    return text_body, html_body
+
+
+class NotificationDigest:
+    # Buffers transfers per recipient and sends one email per window
+
+    def __init__(self, window_seconds, deliver):
+        self.window_seconds = window_seconds
+        self.deliver = deliver
+        self._pending = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def add(self, to_email, subject, transfer):
+        # Queue a transfer; the first one for a recipient starts its window
+        with self._lock:
+            if to_email in self._pending:
+                self._pending[to_email][1].append(transfer)
+                return
+            self._pending[to_email] = (subject, [transfer])
+            timer = threading.Timer(self.window_seconds, self.flush, args=(to_email,))
+            timer.daemon = True
+            self._timers[to_email] = timer
+            timer.start()
+
+    def flush(self, to_email):
+        # Send everything buffered for one recipient
+        with self._lock:
+            entry = self._pending.pop(to_email, None)
+            timer = self._timers.pop(to_email, None)
+        if timer is not None:
+            timer.cancel()
+        if entry is None:
+            return
+
+        subject, transfers = entry
+        if len(transfers) == 1:
+            text_body, html_body = render_transfer(transfers[0])
+        else:
+            subject = f"🎉 {len(transfers)} Transfers Successful - CypherD Wallet"
+            text_body, html_body = render_digest(transfers)
+        self.deliver(to_email, subject, text_body, html_body)
+
+    def flush_all(self):
+        # Send every buffered digest immediately (used on shutdown)
+        with self._lock:
+            recipients = list(self._pending)
+        for to_email in recipients:
+            self.flush(to_email)
@@ -0,0 +1,152 @@
+import cProfile
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+
+# On-demand request profiling. A sampled fraction of requests (or any request
+# carrying the admin header) runs under cProfile; when a latency threshold is
+# set, a background stack sampler watches in-flight requests and keeps the
+# folded stacks of those that turn out slow. Nothing is registered on the app
+# when profiling is disabled, so the request path pays nothing.
+
+
+class StackSampler:
+    # Samples the stacks of registered threads at a fixed interval
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="request-stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def track(self, thread_id):
+        samples = Counter()
+        with self._lock:
+            self._threads[thread_id] = samples
+        return samples
+
+    def untrack(self, thread_id):
+        with self._lock:
+            return self._threads.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                tracked = list(self._threads.items())
+            if not tracked:
+                continue
+            frames = sys._current_frames()
+            for thread_id, samples in tracked:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+                    )
+                    frame = frame.f_back
+                samples[";".join(reversed(stack))] += 1
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        app,
+        directory,
+        sample_rate=0.0,
+        slow_ms=0.0,
+        admin_token=None,
+        sample_interval_ms=5.0,
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.admin_token = admin_token
+        self.captured = 0
+        self.sampler = StackSampler(sample_interval_ms / 1000) if slow_ms > 0 else None
+
+        os.makedirs(directory, exist_ok=True)
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def _wants_full_profile(self):
+        if self.admin_token and request.headers.get("X-Profile") == self.admin_token:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _before_request(self):
+        g.profile_started = time.perf_counter()
+        g.profile_thread = threading.get_ident()
+        g.profiler = None
+        g.profile_samples = None
+
+        if self._wants_full_profile():
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+        elif self.sampler is not None:
+            g.profile_samples = self.sampler.track(g.profile_thread)
+
+    def _teardown_request(self, exc):
+        started = g.pop("profile_started", None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        profiler = g.pop("profiler", None)
+        samples = g.pop("profile_samples", None)
+        thread_id = g.pop("profile_thread", None)
+
+        try:
+            if profiler is not None:
+                profiler.disable()
+                self._write(profiler, None, duration_ms, "sampled", exc)
+            elif samples is not None:
+                self.sampler.untrack(thread_id)
+                if duration_ms >= self.slow_ms:
+                    self._write(None, samples, duration_ms, "slow", exc)
+        except Exception as e:
+            print(f"Failed to write request profile: {e}")
+
+    def _write(self, profiler, samples, duration_ms, reason, exc):
+        route = request.url_rule.rule if request.url_rule else request.path
+        name = "{}-{}-{}-{}ms".format(
+            datetime.utcnow().strftime("%Y%m%dT%H%M%S%f"),
+            request.method,
+            re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root",
+            int(duration_ms),
+        )
+        base = os.path.join(self.directory, name)
+
+        if profiler is not None:
+            profiler.dump_stats(base + ".prof")
+        else:
+            # Folded stacks, ready for flamegraph.pl or speedscope
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                for stack, count in samples.most_common():
+                    f.write(f"{stack} {count}\n")
+
+        metadata = {
+            "route": route,
+            "path": request.path,
+            "method": request.method,
+            "duration_ms": round(duration_ms, 3),
+            "reason": reason,
+            "error": str(exc) if exc else None,
+            "captured_at": datetime.utcnow().isoformat(),
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+        self.captured += 1
@@ -2,6 +2,7 @@
 import os
 import sys
 from dotenv import load_dotenv
+from werkzeug.serving import is_running_from_reloader
 
 # Load environment variables
 load_dotenv()
@@ -9,7 +10,7 @@ load_dotenv()
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import app
+from app import app, recover_prepared_transfers, shards, start_scheduler
 
 if __name__ == "__main__":
     print("Starting CypherD Wallet Backend Server...")
@@ -18,4 +19,12 @@ if __name__ == "__main__":
     print("Make sure to set up your .env file with email credentials for notifications")
     print()
 
+    # The reloader parent only watches files; the child it spawns serves requests
+    if is_running_from_reloader():
+        if shards.count > 1:
+            recovered = recover_prepared_transfers()
+            if recovered:
+                print(f"Finished {recovered} interrupted cross-shard transfers")
+        start_scheduler()
+
     app.run(debug=True, host="0.0.0.0", port=5001, threaded=True)
@@ -0,0 +1,132 @@
+import itertools
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import sessionmaker
+
+# Routes wallet/ledger rows to one of N databases by a hash of the address.
+# With a single shard every helper degrades to the plain single-database
+# behaviour (ids are unchanged and no hashing happens).
+
+
+class ShardRouter:
+    def __init__(self, engines, read_engines=None):
+        self.engines = list(engines)
+        self.sessionmakers = [
+            sessionmaker(autocommit=False, autoflush=False, bind=shard_engine)
+            for shard_engine in self.engines
+        ]
+
+        # Read-only traffic: one list of engines per shard, round-robin within a shard
+        self.read_engines = read_engines or [[shard_engine] for shard_engine in self.engines]
+        self._read_sessionmakers = [
+            itertools.cycle(
+                [
+                    sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+                    for read_engine in shard_read_engines
+                ]
+            )
+            for shard_read_engines in self.read_engines
+        ]
+        self._read_engine_cycles = [
+            itertools.cycle(shard_read_engines) for shard_read_engines in self.read_engines
+        ]
+        self._read_lock = threading.Lock()
+
+    @property
+    def count(self):
+        return len(self.engines)
+
+    def index_for(self, address):
+        # Shard index owning an address (case-insensitive)
+        if self.count == 1:
+            return 0
+        return zlib.crc32(address.lower().encode("utf-8")) % self.count
+
+    def session_for(self, address):
+        # New session on the shard owning an address
+        return self.sessionmakers[self.index_for(address)]()
+
+    def session_at(self, index):
+        # New session on a shard by index
+        return self.sessionmakers[index]()
+
+    def read_session_at(self, index):
+        # New session on one of a shard's read engines
+        with self._read_lock:
+            read_sessionmaker = next(self._read_sessionmakers[index])
+        return read_sessionmaker()
+
+    def read_engine_at(self, index):
+        # One of a shard's read engines, for ORM-free queries
+        with self._read_lock:
+            return next(self._read_engine_cycles[index])
+
+    def encode_id(self, local_id, index):
+        # Globally unique id for a row stored on a given shard
+        return local_id * self.count + index
+
+    def decode_id(self, global_id):
+        # Split a global id into (shard index, local id)
+        global_id = int(global_id)
+        return global_id % self.count, global_id // self.count
+
+    def group_by_shard(self, addresses):
+        # {shard index: [addresses]} preserving input order
+        groups = {}
+        for address in addresses:
+            groups.setdefault(self.index_for(address), []).append(address)
+        return groups
+
+    def fan_out(self, fn):
+        # Run fn(index, session) on every shard in parallel; return results in shard order
+        def run(index):
+            db = self.session_at(index)
+            try:
+                return fn(index, db)
+            finally:
+                db.close()
+
+        if self.count == 1:
+            return [run(0)]
+        with ThreadPoolExecutor(max_workers=self.count) as executor:
+            return list(executor.map(run, range(self.count)))
+
+
+class ReadYourWritesTracker:
+    # Remembers recently written addresses so their reads go to the primary
+    # until replicas have had time to catch up
+
+    def __init__(self, pin_seconds):
+        self.pin_seconds = pin_seconds
+        self._pinned = {}
+        self._lock = threading.Lock()
+
+    def mark(self, *addresses):
+        # Pin addresses to the primary for pin_seconds
+        if self.pin_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for address in addresses:
+                if address:
+                    self._pinned[address.lower()] = now + self.pin_seconds
+
+            # Keep the map bounded by dropping expired pins once it grows
+            if len(self._pinned) > 10000:
+                for address in [a for a, e in self._pinned.items() if e <= now]:
+                    del self._pinned[address]
+
+    def is_pinned(self, address):
+        now = time.monotonic()
+        with self._lock:
+            expires = self._pinned.get(address.lower())
+            if expires is None:
+                return False
+            if expires <= now:
+                del self._pinned[address.lower()]
+                return False
+            return True
+
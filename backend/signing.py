@@ -0,0 +1,146 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from eth_keys import KeyAPI
+from eth_keys.backends import NativeECCBackend
+from eth_utils import keccak, to_checksum_address
+
+# Signature verification backends for EIP-191 personal messages.
+# "coincurve" uses libsecp256k1 when the coincurve package is installed,
+# "native" is the pure-Python implementation bundled with eth_keys.
+
+try:
+    import coincurve
+except ImportError:
+    coincurve = None
+
+SIGNATURE_BACKEND = os.getenv("SIGNATURE_BACKEND", "auto")
+
+# Order of the secp256k1 group
+SECP256K1_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+
+def hash_personal_message(message):
+    # EIP-191 hash of a text message (same as ethers.js v6 signMessage)
+    message_bytes = message.encode("utf-8")
+    prefix = f"\x19Ethereum Signed Message:\n{len(message_bytes)}".encode("utf-8")
+    return keccak(prefix + message_bytes)
+
+
+def parse_signature(signature):
+    # Split a 65 byte hex signature into (r, s, recovery id)
+    if isinstance(signature, str):
+        signature = bytes.fromhex(signature[2:] if signature.startswith("0x") else signature)
+    if len(signature) != 65:
+        raise ValueError("Signature must be 65 bytes")
+
+    r = signature[:32]
+    s = signature[32:64]
+    v = signature[64]
+    if v >= 27:
+        v -= 27
+    if v not in (0, 1):
+        raise ValueError(f"Invalid signature recovery id: {signature[64]}")
+    return r, s, v
+
+
+class NativeBackend:
+    # Pure-Python recovery through eth_keys
+
+    name = "native"
+
+    def __init__(self):
+        self.keys = KeyAPI(NativeECCBackend)
+
+    def recover(self, message_hash, signature):
+        r, s, v = parse_signature(signature)
+        sig = self.keys.Signature(
+            vrs=(v, int.from_bytes(r, "big"), int.from_bytes(s, "big"))
+        )
+        return sig.recover_public_key_from_msg_hash(message_hash).to_checksum_address()
+
+
+class CoincurveBackend:
+    # Recovery through libsecp256k1 (requires the coincurve package)
+
+    name = "coincurve"
+
+    def __init__(self):
+        if coincurve is None:
+            raise RuntimeError("coincurve is not installed")
+
+    def recover(self, message_hash, signature):
+        r, s, v = parse_signature(signature)
+        public_key = coincurve.PublicKey.from_signature_and_message(
+            r + s + bytes([v]), message_hash, hasher=None
+        )
+        return to_checksum_address(keccak(public_key.format(compressed=False)[1:])[-20:])
+
+
+BACKENDS = {
+    "native": NativeBackend,
+    "coincurve": CoincurveBackend,
+}
+
+
+def available_backends():
+    # Names of the backends that can be used in this environment
+    names = ["native"]
+    if coincurve is not None:
+        names.insert(0, "coincurve")
+    return names
+
+
+def get_backend(name=None):
+    # Build a backend by name; "auto" prefers the native library when present
+    name = name or SIGNATURE_BACKEND
+    if name == "auto":
+        name = available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown signature backend: {name}")
+    return BACKENDS[name]()
+
+
+_default_backend = None
+
+
+def recover_message_address(message, signature):
+    # Recover the signer address of an EIP-191 text message
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = get_backend()
+    return _default_backend.recover(hash_personal_message(message), signature)
+
+
+def signature_fingerprint(signature):
+    # SHA-256 of (r, low s): a signature and its malleated (r, n - s) twin share
+    # one fingerprint, and the recovery id is ignored
+    r, s, _ = parse_signature(signature)
+    s_value = int.from_bytes(s, "big")
+    if s_value > SECP256K1_N // 2:
+        s_value = SECP256K1_N - s_value
+    return hashlib.sha256(r + s_value.to_bytes(32, "big")).hexdigest()
+
+
+class RecentSignatureFilter:
+    # Bounded set of recently used signature fingerprints, oldest evicted first
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._fingerprints = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, fingerprint):
+        with self._lock:
+            return fingerprint in self._fingerprints
+
+    def add(self, fingerprint):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._fingerprints[fingerprint] = None
+            self._fingerprints.move_to_end(fingerprint)
+            while len(self._fingerprints) > self.capacity:
+                self._fingerprints.popitem(last=False)
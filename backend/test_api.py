@@ -1,7 +1,27 @@
 #!/usr/bin/env python3
+import os
+import secrets
+import sys
+import time
 import requests
+from eth_account import Account
+from eth_account.messages import encode_defunct
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from intents import INTENT_VERSION, intent_message, schedule_message
 
 BASE_URL = "http://localhost:5001"
+AIRDROP_ADMIN_TOKEN = os.getenv("AIRDROP_ADMIN_TOKEN", "")
+
+Account.enable_unaudited_hdwallet_features()
+
+
+def sign(wallet, message):
+    # EIP-191 signature with the wallet's mnemonic (same as the frontend)
+    account = Account.from_mnemonic(wallet["mnemonic"])
+    return account.sign_message(encode_defunct(text=message)).signature.hex()
 
 
 def test_health():
@@ -116,6 +136,296 @@ def test_get_transactions(address):
         return None
 
 
+def test_transfer_execute(wallet, transfer):
+    # Test signing and executing an initiated transfer, then replaying it
+    print("Testing transfer execution and replay rejection...")
+    try:
+        payload = {
+            "transfer_id": transfer["transfer_id"],
+            "signature": sign(wallet, transfer["message"]),
+        }
+        response = requests.post(f"{BASE_URL}/api/transfer/execute", json=payload)
+        data = response.json()
+        if response.status_code != 200 or not data.get("success"):
+            print(f"Transfer execution failed: {data.get('error')}")
+            return None
+        print("Transfer execution passed")
+        print(f"   Transaction: {data['transaction_id']} ({data['status']})")
+
+        replay = requests.post(f"{BASE_URL}/api/transfer/execute", json=payload)
+        if replay.status_code == 200 or replay.json().get("success"):
+            print("Replay rejection failed: the same signature was accepted twice")
+            return None
+        print(f"Replay rejection passed ({replay.status_code}: {replay.json().get('error')})")
+        return data
+    except Exception as e:
+        print(f"Transfer execution failed: {e}")
+        return None
+
+
+def test_multi_transfer(wallet, recipients):
+    # Test a multi-recipient transfer: one signature, one debit of the total
+    print("Testing multi-recipient transfer...")
+    try:
+        outputs = [
+            {"to_address": recipient["address"], "amount": 0.01 * (index + 1)}
+            for index, recipient in enumerate(recipients)
+        ]
+        expected_total = round(sum(output["amount"] for output in outputs), 6)
+        balance_before = test_get_balance(wallet["address"])
+
+        response = requests.post(
+            f"{BASE_URL}/api/transfer/initiate/multi",
+            json={"from_address": wallet["address"], "outputs": outputs},
+        )
+        data = response.json()
+        if response.status_code != 200 or not data.get("success"):
+            print(f"Multi-recipient initiation failed: {data.get('error')}")
+            return None
+        if data["amount"] != expected_total:
+            print(f"Multi-recipient total wrong: {data['amount']} != {expected_total}")
+            return None
+
+        response = requests.post(
+            f"{BASE_URL}/api/transfer/execute",
+            json={"transfer_id": data["transfer_id"], "signature": sign(wallet, data["message"])},
+        )
+        result = response.json()
+        if response.status_code != 200 or not result.get("success"):
+            print(f"Multi-recipient execution failed: {result.get('error')}")
+            return None
+
+        debited = round(balance_before - test_get_balance(wallet["address"]), 6)
+        if debited != expected_total or len(result["transaction_ids"]) != len(outputs):
+            print(f"Multi-recipient transfer failed: debited {debited}, expected {expected_total}")
+            return None
+        print("Multi-recipient transfer passed")
+        print(f"   Total: {expected_total} ETH to {len(outputs)} recipients")
+        return result
+    except Exception as e:
+        print(f"Multi-recipient transfer failed: {e}")
+        return None
+
+
+def test_intent_nonce_reuse(wallet, to_address):
+    # Test a signed transfer intent, then a second intent reusing its nonce
+    print("Testing transfer intent and nonce reuse...")
+    try:
+        nonce = secrets.token_hex(8)
+        expires_at = int(time.time()) + 60
+        results = []
+        for amount in (0.01, 0.02):
+            intent = {
+                "version": INTENT_VERSION,
+                "from_address": wallet["address"],
+                "to_address": to_address,
+                "amount": amount,
+                "nonce": nonce,
+                "expires_at": expires_at,
+            }
+            message = intent_message(wallet["address"], to_address, amount, nonce, expires_at)
+            response = requests.post(
+                f"{BASE_URL}/api/transfer/submit",
+                json={"intent": intent, "signature": sign(wallet, message)},
+            )
+            results.append((response.status_code, response.json()))
+
+        (first_status, first), (second_status, second) = results
+        if first_status != 200 or not first.get("success"):
+            print(f"Transfer intent failed: {first.get('error')}")
+            return None
+        if second_status != 409:
+            print(f"Nonce reuse failed: second intent returned {second_status}")
+            return None
+        print("Transfer intent passed")
+        print(f"Nonce reuse passed ({second.get('error')})")
+        return first
+    except Exception as e:
+        print(f"Transfer intent failed: {e}")
+        return None
+
+
+def test_invalid_amounts(wallet, to_address):
+    # Test that NaN, infinite and negative amounts are rejected on every transfer path
+    print("Testing invalid transfer amounts...")
+    try:
+        for amount in ("NaN", "Infinity", "-1"):
+            responses = [
+                requests.post(
+                    f"{BASE_URL}/api/transfer/initiate",
+                    json={
+                        "from_address": wallet["address"],
+                        "to_address": to_address,
+                        "amount": amount,
+                        "amount_type": "ETH",
+                    },
+                ),
+                requests.post(
+                    f"{BASE_URL}/api/transfer/initiate/multi",
+                    json={
+                        "from_address": wallet["address"],
+                        "outputs": [{"to_address": to_address, "amount": amount}],
+                    },
+                ),
+                requests.post(
+                    f"{BASE_URL}/api/transfer/submit",
+                    json={
+                        "intent": {
+                            "version": INTENT_VERSION,
+                            "from_address": wallet["address"],
+                            "to_address": to_address,
+                            "amount": amount,
+                            "nonce": secrets.token_hex(8),
+                            "expires_at": int(time.time()) + 60,
+                        },
+                        "signature": "0x00",
+                    },
+                ),
+            ]
+            statuses = [response.status_code for response in responses]
+            if statuses != [400, 400, 400]:
+                print(f"Invalid amount {amount} failed: got {statuses}")
+                return False
+        print("Invalid transfer amounts passed")
+        return True
+    except Exception as e:
+        print(f"Invalid transfer amounts failed: {e}")
+        return False
+
+
+def test_scheduled_transfer(wallet, to_address):
+    # Test a one-off scheduled transfer (needs the server started with SCHEDULER=true)
+    print("Testing scheduled transfer...")
+    try:
+        nonce = secrets.token_hex(8)
+        start_at = int(time.time())
+        schedule = {
+            "version": INTENT_VERSION,
+            "from_address": wallet["address"],
+            "to_address": to_address,
+            "amount": 0.01,
+            "start_at": start_at,
+            "interval_seconds": 0,
+            "occurrences": 1,
+            "nonce": nonce,
+        }
+        message = schedule_message(wallet["address"], to_address, 0.01, start_at, 0, 1, nonce)
+        response = requests.post(
+            f"{BASE_URL}/api/schedules",
+            json={"schedule": schedule, "signature": sign(wallet, message)},
+        )
+        data = response.json()
+        if response.status_code != 200 or not data.get("success"):
+            print(f"Scheduled transfer failed: {data.get('error')}")
+            return None
+
+        # Wait a few scheduler ticks for the run
+        for _ in range(10):
+            time.sleep(1)
+            schedules = requests.get(f"{BASE_URL}/api/schedules/{wallet['address']}").json()
+            current = next(
+                item for item in schedules["schedules"]
+                if item["schedule_id"] == data["schedule_id"]
+            )
+            if current["status"] != "active":
+                break
+        if current["status"] == "active":
+            print("Scheduled transfer skipped: the scheduler is not running (SCHEDULER=true)")
+            return None
+        if current["status"] != "completed" or current["runs"] != 1 or current["last_error"]:
+            print(f"Scheduled transfer failed: {current}")
+            return None
+        print("Scheduled transfer passed")
+        print(f"   Schedule {data['schedule_id']} ran once")
+        return current
+    except Exception as e:
+        print(f"Scheduled transfer failed: {e}")
+        return None
+
+
+def test_airdrop_rerun(address):
+    # Test that re-running an airdrop credits nothing twice (needs AIRDROP_ADMIN_TOKEN)
+    print("Testing airdrop re-run...")
+    if not AIRDROP_ADMIN_TOKEN:
+        print("Airdrop skipped: set AIRDROP_ADMIN_TOKEN for the server and this script")
+        return None
+    try:
+        airdrop_id = f"test-{secrets.token_hex(4)}"
+        payload = {"airdrop_id": airdrop_id, "credits": [{"address": address, "amount": 0.5}]}
+        headers = {"X-Admin-Token": AIRDROP_ADMIN_TOKEN}
+        balance_before = test_get_balance(address)
+
+        first = requests.post(f"{BASE_URL}/api/admin/airdrop", json=payload, headers=headers)
+        second = requests.post(f"{BASE_URL}/api/admin/airdrop", json=payload, headers=headers)
+        payload["credits"][0]["amount"] = 5
+        changed = requests.post(f"{BASE_URL}/api/admin/airdrop", json=payload, headers=headers)
+
+        credited = round(test_get_balance(address) - balance_before, 6)
+        if first.status_code != 200 or first.json()["credited"] != 1:
+            print(f"Airdrop failed: {first.json().get('error')}")
+            return None
+        if second.status_code != 200 or second.json()["chunks"] != 0 or credited != 0.5:
+            print(f"Airdrop re-run failed: credited {credited} ETH")
+            return None
+        if changed.status_code != 409:
+            print(f"Airdrop re-run with different credits failed: {changed.status_code}")
+            return None
+        print("Airdrop re-run passed")
+        print(f"   Credited once: {credited} ETH")
+        return first.json()
+    except Exception as e:
+        print(f"Airdrop re-run failed: {e}")
+        return None
+
+
+def test_transactions_delta(address, since_id):
+    # Test delta sync: only transactions after the high-water mark come back
+    print("Testing transaction delta sync...")
+    try:
+        response = requests.get(
+            f"{BASE_URL}/api/transactions/{address}/delta", params={"since_id": since_id}
+        )
+        data = response.json()
+        if response.status_code != 200 or not data.get("success"):
+            print(f"Transaction delta failed: {data.get('error')}")
+            return None
+        if any(transaction["id"] <= since_id for transaction in data["transactions"]):
+            print("Transaction delta failed: rows at or below since_id returned")
+            return None
+        print("Transaction delta passed")
+        print(f"   {len(data['transactions'])} new transactions since {since_id}")
+        return data
+    except Exception as e:
+        print(f"Transaction delta failed: {e}")
+        return None
+
+
+def test_event_feed():
+    # Test the ledger event feed: read a batch, commit its cursor, read again
+    print("Testing ledger event feed...")
+    try:
+        consumer = f"test-{secrets.token_hex(4)}"
+        first = requests.get(f"{BASE_URL}/api/events/{consumer}", params={"limit": 50}).json()
+        if not first.get("success") or not first["events"]:
+            print(f"Event feed failed: {first.get('error', 'no events')}")
+            return None
+
+        requests.post(
+            f"{BASE_URL}/api/events/{consumer}/offsets", json={"cursor": first["cursor"]}
+        )
+        second = requests.get(f"{BASE_URL}/api/events/{consumer}", params={"limit": 50}).json()
+        seen = {(event["id"], event["type"]) for event in first["events"]}
+        if any((event["id"], event["type"]) in seen for event in second["events"]):
+            print("Event feed failed: committed events were delivered again")
+            return None
+        print("Event feed passed")
+        print(f"   {len(first['events'])} events, then {len(second['events'])} after the cursor")
+        return first
+    except Exception as e:
+        print(f"Event feed failed: {e}")
+        return None
+
+
 def main():
     # Run all tests
     print("Starting CypherD Wallet API Tests")
@@ -157,6 +467,51 @@ def main():
     transactions1 = test_get_transactions(wallet1["address"])
     test_get_transactions(wallet2["address"])
 
+    print()
+
+    # Remember the history high-water mark for the delta sync test
+    history = requests.get(f"{BASE_URL}/api/transactions/{wallet2['address']}").json()
+    high_water_mark = history.get("high_water_mark", 0)
+
+    # Test transfer execution and replay rejection
+    executed = test_transfer_execute(wallet1, transfer) if transfer else None
+
+    print()
+
+    # Test a multi-recipient transfer
+    wallet3 = test_create_wallet()
+    multi = test_multi_transfer(wallet1, [wallet2, wallet3]) if wallet3 else None
+
+    print()
+
+    # Test a signed transfer intent and nonce reuse
+    intent = test_intent_nonce_reuse(wallet1, wallet2["address"])
+
+    print()
+
+    # Test invalid amounts
+    amounts_rejected = test_invalid_amounts(wallet1, wallet2["address"])
+
+    print()
+
+    # Test a scheduled transfer
+    scheduled = test_scheduled_transfer(wallet1, wallet2["address"])
+
+    print()
+
+    # Test airdrop re-run idempotency
+    airdrop = test_airdrop_rerun(wallet2["address"])
+
+    print()
+
+    # Test delta sync
+    delta = test_transactions_delta(wallet2["address"], high_water_mark)
+
+    print()
+
+    # Test the ledger event feed
+    events = test_event_feed()
+
     print()
     print("=" * 50)
     print("All API tests completed!")
@@ -166,6 +521,14 @@ def main():
     print(f"   Wallet 2: {wallet2['address'][:10]}... (Balance: {balance2} ETH)")
     print(f"   Transfer initiated: {transfer is not None}")
     print(f"   Transactions found: {len(transactions1) if transactions1 else 0}")
+    print(f"   Transfer executed (replay rejected): {executed is not None}")
+    print(f"   Multi-recipient transfer: {multi is not None}")
+    print(f"   Intent (nonce reuse rejected): {intent is not None}")
+    print(f"   Invalid amounts rejected: {amounts_rejected}")
+    print(f"   Scheduled transfer: {scheduled is not None}")
+    print(f"   Airdrop re-run: {airdrop is not None}")
+    print(f"   Delta sync: {len(delta['transactions']) if delta else 'failed'} new transactions")
+    print(f"   Event feed: {events is not None}")
     print()
     print("Backend API is working correctly!")
     print("You can now start the frontend with: cd frontend && npm start")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Query-scaling tests: for each dataset size a worker process loads a
+# synthetic dataset into a fresh SQLite file and measures endpoint latency
+# in-process; the parent checks absolute bounds and growth across sizes.
+
+DEFAULT_SIZES = "1000:10000,10000:100000"
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples):
+    return {
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+    }
+
+
+def run_worker(wallets, transactions, iterations):
+    # Load a dataset and time get_balance, get_transactions and execute_transfer
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+
+    import app as wallet_app
+    from generate_dataset import generate_dataset
+
+    hot, cold = generate_dataset(wallets, transactions, progress=False)
+    wallet_app.send_notification = lambda **kwargs: None
+    client = wallet_app.app.test_client()
+    rng = random.Random(7)
+
+    def timed(fn):
+        started = time.perf_counter()
+        response = fn()
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.get_json()
+        return elapsed
+
+    balance = [
+        timed(lambda: client.get(f"/api/wallet/balance/{rng.choice(hot + cold)}"))
+        for _ in range(iterations)
+    ]
+    history_cold = [
+        timed(lambda: client.get(f"/api/transactions/{rng.choice(cold)}"))
+        for _ in range(iterations)
+    ]
+    history_hot = [
+        timed(lambda: client.get(f"/api/transactions/{rng.choice(hot)}"))
+        for _ in range(max(1, iterations // 10))
+    ]
+
+    # A real key so signatures verify; funded directly in its shard
+    account = Account.create()
+    db = wallet_app.shards.session_for(account.address)
+    db.add(wallet_app.Wallet(address=account.address, balance=1e9))
+    db.commit()
+    db.close()
+
+    execute = []
+    for _ in range(iterations):
+        initiated = client.post(
+            "/api/transfer/initiate",
+            json={
+                "from_address": account.address,
+                "to_address": rng.choice(hot),
+                "amount": 0.001,
+            },
+        ).get_json()
+        signature = Account.sign_message(
+            encode_defunct(text=initiated["message"]), account.key
+        ).signature.hex()
+        execute.append(
+            timed(
+                lambda: client.post(
+                    "/api/transfer/execute",
+                    json={"transfer_id": initiated["transfer_id"], "signature": signature},
+                )
+            )
+        )
+
+    print(
+        json.dumps(
+            {
+                "wallets": wallets,
+                "transactions": transactions,
+                "get_balance": summarize(balance),
+                "get_transactions_cold": summarize(history_cold),
+                "get_transactions_hot": summarize(history_hot),
+                "execute_transfer": summarize(execute),
+            }
+        )
+    )
+
+
+def measure(wallets, transactions, iterations):
+    # Run one worker against a fresh database and return its measurements
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'scaling.db')}"
+        env.pop("SHARD_URLS", None)
+        env.pop("READ_REPLICA_URLS", None)
+        env["ARCHIVE_DIR"] = os.path.join(tmp, "archive")
+        output = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--worker",
+                f"{wallets}:{transactions}",
+                "--iterations",
+                str(iterations),
+            ],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint latency vs. dataset size")
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help="comma-separated wallets:transactions pairs (default %(default)s)",
+    )
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--max-balance-ms", type=float, default=25.0)
+    parser.add_argument("--max-history-ms", type=float, default=100.0)
+    parser.add_argument("--max-execute-ms", type=float, default=150.0)
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=3.0,
+        help="allowed p95 ratio between the largest and smallest dataset",
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        wallets, transactions = (int(n) for n in args.worker.split(":"))
+        run_worker(wallets, transactions, args.iterations)
+        return
+
+    print("Starting CypherD Wallet Query-Scaling Tests")
+    print("=" * 50)
+
+    results = []
+    for size in args.sizes.split(","):
+        wallets, transactions = (int(n) for n in size.split(":"))
+        print(f"Measuring {wallets} wallets / {transactions} transactions...")
+        result = measure(wallets, transactions, args.iterations)
+        results.append(result)
+        for endpoint in (
+            "get_balance",
+            "get_transactions_cold",
+            "get_transactions_hot",
+            "execute_transfer",
+        ):
+            print(
+                f"   {endpoint:<24} p50 {result[endpoint]['p50_ms']:>8.2f} ms"
+                f"   p95 {result[endpoint]['p95_ms']:>8.2f} ms"
+            )
+
+    failures = []
+    bounds = {
+        "get_balance": args.max_balance_ms,
+        "get_transactions_cold": args.max_history_ms,
+        "execute_transfer": args.max_execute_ms,
+    }
+    for result in results:
+        for endpoint, bound in bounds.items():
+            if result[endpoint]["p95_ms"] > bound:
+                failures.append(
+                    f"{endpoint} p95 {result[endpoint]['p95_ms']} ms > {bound} ms "
+                    f"at {result['transactions']} transactions"
+                )
+
+    smallest, largest = results[0], results[-1]
+    for endpoint in bounds:
+        growth = largest[endpoint]["p95_ms"] / max(smallest[endpoint]["p95_ms"], 1e-6)
+        if len(results) > 1 and growth > args.max_growth:
+            failures.append(f"{endpoint} p95 grew {growth:.1f}x (> {args.max_growth}x)")
+
+    print()
+    print("=" * 50)
+    if failures:
+        print("Scaling tests failed:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("All scaling tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from eth_account import Account
+from mnemonic import Mnemonic
+
+# Pre-generated (mnemonic, address) pairs so create_wallet does not pay for
+# entropy, mnemonic generation and HD derivation on the request path.
+# Pairs only ever live in this process's memory; unused ones are discarded
+# on shutdown and never written anywhere.
+
+_mnemo = Mnemonic("english")
+Account.enable_unaudited_hdwallet_features()
+
+
+def generate_keypair(_index=None):
+    # Generate a fresh mnemonic and its default-path address
+    mnemonic_phrase = _mnemo.generate(strength=128)
+    account = Account.from_mnemonic(mnemonic_phrase)
+    return mnemonic_phrase, account.address
+
+
+class KeypairPool:
+    # Bounded pool refilled by worker processes when it runs low
+
+    def __init__(self, size, workers=None, low_watermark=None):
+        self.size = size
+        self.workers = workers
+        self.low_watermark = size // 2 if low_watermark is None else low_watermark
+        self.hits = 0
+        self.misses = 0
+        self._pairs = queue.Queue(maxsize=size)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        # Start the background producer thread
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="keypair-pool", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        # Stop producing and drop every unused pair
+        self._stopped.set()
+        self._wake.set()
+        while True:
+            try:
+                self._pairs.get_nowait()
+            except queue.Empty:
+                break
+
+    def take(self):
+        # Pop a ready pair, or None when the pool is empty
+        try:
+            pair = self._pairs.get_nowait()
+            self.hits += 1
+        except queue.Empty:
+            pair = None
+            self.misses += 1
+
+        if self._pairs.qsize() <= self.low_watermark:
+            self._wake.set()
+        return pair
+
+    def available(self):
+        # Number of ready pairs
+        return self._pairs.qsize()
+
+    def _run(self):
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while not self._stopped.is_set():
+                missing = self.size - self._pairs.qsize()
+                if missing > 0 and self._pairs.qsize() <= self.low_watermark:
+                    for pair in executor.map(generate_keypair, range(missing)):
+                        if self._stopped.is_set():
+                            break
+                        try:
+                            self._pairs.put_nowait(pair)
+                        except queue.Full:
+                            break
+
+                self._wake.wait(timeout=1.0)
+                self._wake.clear()
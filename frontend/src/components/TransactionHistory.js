@@ -25,6 +25,16 @@ import {
   Schedule
 } from '@mui/icons-material';
 
+// Per-address history and the id up to which it is known to be complete
+const historyCache = {};
+
+const mergeTransactions = (existing, incoming) => {
+  const byId = {};
+  existing.forEach((tx) => { byId[tx.id] = tx; });
+  incoming.forEach((tx) => { byId[tx.id] = tx; });
+  return Object.values(byId).sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
+};
+
 const TransactionHistory = ({ wallet }) => {
   const [transactions, setTransactions] = useState([]);
   const [loading, setLoading] = useState(false);
@@ -35,18 +45,51 @@ const TransactionHistory = ({ wallet }) => {
   }, [wallet.address]);
 
   const fetchTransactions = async () => {
-    setLoading(true);
+    const address = wallet.address;
+    const cached = historyCache[address];
+    if (cached) {
+      setTransactions(cached.transactions);
+    } else {
+      setLoading(true);
+    }
     setError('');
 
     try {
-      const response = await fetch(`http://localhost:5001/api/transactions/${wallet.address}`);
-      const data = await response.json();
+      if (!cached) {
+        // First sync: full history, including archived transactions
+        const response = await fetch(`http://localhost:5001/api/transactions/${address}`);
+        const data = await response.json();
+
+        if (data.success) {
+          historyCache[address] = {
+            transactions: data.transactions,
+            highWaterMark: data.high_water_mark
+          };
+          setTransactions(data.transactions);
+        } else {
+          setError(data.error || 'Failed to fetch transactions');
+        }
+        return;
+      }
+
+      // Later syncs: only transactions newer than the high-water mark
+      let hasMore = true;
+      while (hasMore) {
+        const response = await fetch(
+          `http://localhost:5001/api/transactions/${address}/delta?since_id=${cached.highWaterMark}`
+        );
+        const data = await response.json();
 
-      if (data.success) {
-        setTransactions(data.transactions);
-      } else {
-        setError(data.error || 'Failed to fetch transactions');
+        if (!data.success) {
+          setError(data.error || 'Failed to fetch transactions');
+          return;
+        }
+        cached.transactions = mergeTransactions(cached.transactions, data.transactions);
+        cached.highWaterMark = data.high_water_mark;
+        // An unfinished transfer also reports has_more; stop once nothing new arrives
+        hasMore = data.has_more && data.transactions.length > 0;
       }
+      setTransactions(cached.transactions);
     } catch (error) {
       setError('Network error: ' + error.message);
     } finally {
@@ -1,79 +1,282 @@
 #!/usr/bin/env python3
-import sqlite3
+import argparse
+import heapq
+import itertools
+import os
+import sys
+from datetime import datetime
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from dotenv import load_dotenv
+from sqlalchemy import MetaData, Table, create_engine, func, or_, select
+from sqlalchemy.exc import NoSuchTableError
+
+# Load backend environment (DATABASE_URL etc.)
+load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+
+# The viewer opens its own read-only connections and never imports app.py, so
+# inspecting a database never creates tables, recovers transfers or starts
+# background threads.
+
+
+def resolve_url(url):
+    # Relative SQLite URLs are resolved against the backend directory
+    if url.startswith("sqlite:///") and not url.startswith("sqlite:////"):
+        return "sqlite:///" + os.path.join(BACKEND_DIR, url[len("sqlite:///") :])
+    return url
+
+
+DATABASE_URL = resolve_url(os.getenv("DATABASE_URL", "sqlite:///wallet.db"))
+SHARD_URLS = [
+    resolve_url(url.strip()) for url in os.getenv("SHARD_URLS", "").split(",") if url.strip()
+]
+engines = [create_engine(url) for url in SHARD_URLS or [DATABASE_URL]]
+
+# Table definitions, reflected from the first database by load_tables()
+Wallet = Transaction = PendingTransfer = None
+
+
+def load_tables():
+    # All shards share one schema, so reflecting the first database is enough
+    global Wallet, Transaction, PendingTransfer
+    metadata = MetaData()
+    Wallet = Table("wallets", metadata, autoload_with=engines[0])
+    Transaction = Table("transactions", metadata, autoload_with=engines[0])
+    PendingTransfer = Table("pending_transfers", metadata, autoload_with=engines[0])
+
+# Rows fetched from the database per round trip while streaming
+STREAM_BATCH_SIZE = 500
+
+
+def stream_rows(stmt, db_engine):
+    # Iterate over a query without loading the whole result into memory
+    with db_engine.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True, yield_per=STREAM_BATCH_SIZE
+        ).execute(stmt)
+        for row in result:
+            yield row
+
+
+def global_id(local_id, index):
+    # Same encoding as the API (ShardRouter.encode_id)
+    return local_id * len(engines) + index
+
+
+def stream_all_shards(stmt, args):
+    # Newest rows first across every shard: each shard streams its own ordered
+    # page and the streams are merged by created_at
+    stmt = stmt.limit(args.limit + args.offset)
+    streams = [
+        ((row.created_at, global_id(row.id, index), row) for row in stream_rows(stmt, db_engine))
+        for index, db_engine in enumerate(engines)
+    ]
+    merged = heapq.merge(*streams, key=lambda item: (item[0], item[1]), reverse=True)
+    for _, row_id, row in itertools.islice(merged, args.offset, args.offset + args.limit):
+        yield row_id, row
+
+
+def wallets_query(args):
+    stmt = select(Wallet.c.id, Wallet.c.address, Wallet.c.balance, Wallet.c.created_at)
+    if args.address:
+        stmt = stmt.where(Wallet.c.address == args.address)
+    if args.min_balance is not None:
+        stmt = stmt.where(Wallet.c.balance >= args.min_balance)
+    return stmt.order_by(Wallet.c.created_at.desc())
+
+
+def transactions_query(args):
+    stmt = select(
+        Transaction.c.id,
+        Transaction.c.from_address,
+        Transaction.c.to_address,
+        Transaction.c.amount,
+        Transaction.c.amount_usd,
+        Transaction.c.status,
+        Transaction.c.created_at,
+    )
+    if args.address:
+        stmt = stmt.where(
+            or_(
+                Transaction.c.from_address == args.address,
+                Transaction.c.to_address == args.address,
+            )
+        )
+    if args.status:
+        stmt = stmt.where(Transaction.c.status == args.status)
+    if args.since:
+        stmt = stmt.where(Transaction.c.created_at >= args.since)
+    return stmt.order_by(Transaction.c.created_at.desc())
+
+
+def pending_query(args):
+    stmt = select(
+        PendingTransfer.c.id,
+        PendingTransfer.c.from_address,
+        PendingTransfer.c.to_address,
+        PendingTransfer.c.amount,
+        PendingTransfer.c.amount_usd,
+        PendingTransfer.c.expires_at,
+        PendingTransfer.c.created_at,
+    )
+    if args.address:
+        stmt = stmt.where(
+            or_(
+                PendingTransfer.c.from_address == args.address,
+                PendingTransfer.c.to_address == args.address,
+            )
+        )
+    return stmt.order_by(PendingTransfer.c.created_at.desc())
+
+
+def print_wallets(args):
+    print("\nWALLETS")
+    print("-" * 30)
+    shown = 0
+    for wallet_id, wallet in stream_all_shards(wallets_query(args), args):
+        print(f"ID: {wallet_id}")
+        print(f"Address: {wallet.address}")
+        print(f"Balance: {wallet.balance} ETH")
+        print(f"Created: {wallet.created_at}")
+        print("-" * 30)
+        shown += 1
+    if not shown:
+        print("No wallets found")
+
+
+def print_transactions(args):
+    print("\nTRANSACTIONS")
+    print("-" * 30)
+    shown = 0
+    for tx_id, tx in stream_all_shards(transactions_query(args), args):
+        print(f"ID: {tx_id}")
+        print(f"From: {tx.from_address}")
+        print(f"To: {tx.to_address}")
+        print(f"Amount: {tx.amount} ETH")
+        print(f"USD: {tx.amount_usd if tx.amount_usd else 'N/A'}")
+        print(f"Status: {tx.status}")
+        print(f"Created: {tx.created_at}")
+        print("-" * 30)
+        shown += 1
+    if not shown:
+        print("No transactions found")
+
+
+def print_pending(args):
+    print("\nPENDING TRANSFERS")
+    print("-" * 30)
+    shown = 0
+    for pending_id, p in stream_all_shards(pending_query(args), args):
+        print(f"ID: {pending_id}")
+        print(f"From: {p.from_address}")
+        print(f"To: {p.to_address}")
+        print(f"Amount: {p.amount} ETH")
+        print(f"USD: {p.amount_usd if p.amount_usd else 'N/A'}")
+        print(f"Expires: {p.expires_at}")
+        print("-" * 30)
+        shown += 1
+    if not shown:
+        print("No pending transfers")
+
+
+def print_summary(args):
+    # Summary statistics computed with SQL aggregates on every shard
+    wallet_count = transaction_count = pending_count = expired_count = 0
+    total_supply = total_volume = 0.0
+    top_holders = []
+    for db_engine in engines:
+        with db_engine.connect() as conn:
+            count, supply = conn.execute(
+                select(func.count(Wallet.c.id), func.coalesce(func.sum(Wallet.c.balance), 0.0))
+            ).one()
+            wallet_count += count
+            total_supply += supply
+            count, volume = conn.execute(
+                select(
+                    func.count(Transaction.c.id),
+                    func.coalesce(func.sum(Transaction.c.amount), 0.0),
+                )
+            ).one()
+            transaction_count += count
+            total_volume += volume
+            pending_count += conn.execute(select(func.count(PendingTransfer.c.id))).scalar()
+            expired_count += conn.execute(
+                select(func.count(PendingTransfer.c.id)).where(
+                    PendingTransfer.c.expires_at < datetime.utcnow()
+                )
+            ).scalar()
+            top_holders.extend(
+                conn.execute(
+                    select(Wallet.c.address, Wallet.c.balance)
+                    .order_by(Wallet.c.balance.desc())
+                    .limit(args.top)
+                ).all()
+            )
+    top_holders = heapq.nlargest(args.top, top_holders, key=lambda holder: holder[1])
+
+    print(f"\nSUMMARY")
+    print(f"Total Wallets: {wallet_count}")
+    print(f"Total Supply: {total_supply:.6f} ETH")
+    print(f"Total Transactions: {transaction_count}")
+    if len(engines) > 1:
+        print("   (cross-shard transfers are stored on both shards and counted twice)")
+    print(f"Total Volume: {total_volume:.6f} ETH")
+    print(f"Pending Transfers: {pending_count} ({expired_count} expired)")
+
+    if top_holders:
+        print(f"\nTop {len(top_holders)} Holders:")
+        for rank, (address, balance) in enumerate(top_holders, start=1):
+            print(f"   {rank}. {address}  {balance} ETH")
+
 
 def view_database():
-    # View all data in the CypherD Wallet database
+    # View data in the CypherD Wallet database
+    parser = argparse.ArgumentParser(description="Inspect the CypherD Wallet database")
+    parser.add_argument(
+        "--table",
+        choices=["wallets", "transactions", "pending", "all", "none"],
+        default="all",
+        help="which table to list (none prints only the summary)",
+    )
+    parser.add_argument("--address", help="only rows involving this address")
+    parser.add_argument("--status", help="only transactions with this status")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="only transactions created at or after this ISO timestamp",
+    )
+    parser.add_argument("--min-balance", type=float, help="only wallets with at least this balance")
+    parser.add_argument("--limit", type=int, default=20, help="rows per table (default 20)")
+    parser.add_argument("--offset", type=int, default=0, help="rows to skip per table")
+    parser.add_argument("--top", type=int, default=5, help="number of top holders to show")
+    parser.add_argument("--no-summary", action="store_true", help="skip summary statistics")
+    args = parser.parse_args()
+
     try:
-        # Connect to database
-        conn = sqlite3.connect('backend/wallet.db')
-        cursor = conn.cursor()
-        
         print("🗄️  CypherD Wallet Database Viewer")
         print("=" * 50)
-        
-        # View Wallets
-        print("\nWALLETS")
-        print("-" * 30)
-        cursor.execute("SELECT * FROM wallets ORDER BY created_at DESC")
-        wallets = cursor.fetchall()
-        
-        if wallets:
-            for wallet in wallets:
-                print(f"ID: {wallet[0]}")
-                print(f"Address: {wallet[1]}")
-                print(f"Balance: {wallet[2]} ETH")
-                print(f"Created: {wallet[3]}")
-                print("-" * 30)
-        else:
-            print("No wallets found")
-        
-        # View Transactions
-        print("\nTRANSACTIONS")
-        print("-" * 30)
-        cursor.execute("SELECT * FROM transactions ORDER BY created_at DESC")
-        transactions = cursor.fetchall()
-        
-        if transactions:
-            for tx in transactions:
-                print(f"ID: {tx[0]}")
-                print(f"From: {tx[1]}")
-                print(f"To: {tx[2]}")
-                print(f"Amount: {tx[3]} ETH")
-                print(f"USD: {tx[4] if tx[4] else 'N/A'}")
-                print(f"Status: {tx[5]}")
-                print(f"Created: {tx[7]}")
-                print("-" * 30)
-        else:
-            print("No transactions found")
-        
-        # View Pending Transfers
-        print("\nPENDING TRANSFERS")
-        print("-" * 30)
-        cursor.execute("SELECT * FROM pending_transfers ORDER BY created_at DESC")
-        pending = cursor.fetchall()
-        
-        if pending:
-            for p in pending:
-                print(f"ID: {p[0]}")
-                print(f"From: {p[1]}")
-                print(f"To: {p[2]}")
-                print(f"Amount: {p[3]} ETH")
-                print(f"USD: {p[4] if p[4] else 'N/A'}")
-                print(f"Expires: {p[6]}")
-                print("-" * 30)
-        else:
-            print("No pending transfers")
-        
-        # Summary
-        print(f"\nSUMMARY")
-        print(f"Total Wallets: {len(wallets)}")
-        print(f"Total Transactions: {len(transactions)}")
-        print(f"Pending Transfers: {len(pending)}")
-        
-        conn.close()
-        
+        load_tables()
+        for index, db_engine in enumerate(engines):
+            label = f"Shard {index}" if len(engines) > 1 else "Database"
+            print(f"{label}: {db_engine.url.render_as_string(hide_password=True)}")
+
+        if args.table in ("wallets", "all"):
+            print_wallets(args)
+        if args.table in ("transactions", "all"):
+            print_transactions(args)
+        if args.table in ("pending", "all"):
+            print_pending(args)
+
+        if not args.no_summary:
+            print_summary(args)
+
+    except NoSuchTableError as e:
+        print(f"Error viewing database: table {e} not found (run backend/init_db.py first)")
     except Exception as e:
         print(f"Error viewing database: {e}")
 
+
 if __name__ == '__main__':
     view_database()